@@ -9,6 +9,9 @@ Version: 3.0 - Correcteur universel
 import os
 import sys
 import shutil
+import subprocess
+import hashlib
+import tempfile
 import re
 from pathlib import Path
 from datetime import datetime
@@ -75,6 +78,15 @@ class ComprehensiveFixer:
         
         print(f"   ✅ {len(python_files)} fichiers sauvegardés dans {self.backup_dir}")
     
+    def _read_source_bytes(self, file_path: Path) -> bytes:
+        """Lit un fichier source en octets (sans décodage UTF-8)
+
+        Lecture binaire directe: les sources sont petites et un mmap recopié
+        en bytes coûterait autant, en plus du mappage.
+        """
+        with open(file_path, 'rb') as f:
+            return f.read()
+    
     def _fix_critical_errors(self):
         """Corrige toutes les erreurs critiques identifiées"""
         print("\n🚨 Phase 2: Correction des erreurs critiques")
@@ -102,11 +114,10 @@ class ComprehensiveFixer:
         if not file_path.exists():
             return
             
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = self._read_source_bytes(file_path)
         
         # Corriger la variable non définie original_filename
-        old_pattern = r'def sanitize_filename_secure\(filename: str, max_length: int = 100\) -> str:\s*"""Nettoyage sécurisé de nom de fichier"""\s*import re\s*import unicodedata'
+        old_pattern = r'def sanitize_filename_secure\(filename: str, max_length: int = 100\) -> str:\s*"""Nettoyage sécurisé de nom de fichier"""\s*import re\s*import unicodedata'.encode('utf-8')
         
         new_code = '''def sanitize_filename_secure(filename: str, max_length: int = 100) -> str:
     """Nettoyage sécurisé de nom de fichier"""
@@ -114,44 +125,44 @@ class ComprehensiveFixer:
     import unicodedata
     
     # CORRECTION: Sauvegarder le nom original
-    original_filename = filename'''
+    original_filename = filename'''.encode('utf-8')
         
         content = re.sub(old_pattern, new_code, content, flags=re.DOTALL)
         
         # Corriger les imports manquants
-        if "from typing import List" not in content:
+        if b"from typing import List" not in content:
             content = content.replace(
-                "from typing import Union, Optional",
-                "from typing import Union, Optional, List"
+                b"from typing import Union, Optional",
+                b"from typing import Union, Optional, List"
             )
         
         # Corriger la fonction validate_file_path_secure pour éviter les doublons
-        if content.count("def validate_file_path_secure") > 1:
+        if content.count(b"def validate_file_path_secure") > 1:
             # Garder seulement la première définition complète
-            parts = content.split("def validate_file_path_secure")
+            parts = content.split(b"def validate_file_path_secure")
             if len(parts) > 2:
                 # Reconstruire avec seulement la première fonction complète
-                content = parts[0] + "def validate_file_path_secure" + parts[1]
+                content = parts[0] + b"def validate_file_path_secure" + parts[1]
                 # Trouver la fin de la première fonction et garder le reste
-                lines = content.split('\n')
+                lines = content.split(b'\n')
                 in_function = False
                 indent_level = 0
                 result_lines = []
                 
                 for line in lines:
-                    if "def validate_file_path_secure" in line:
+                    if b"def validate_file_path_secure" in line:
                         in_function = True
                         indent_level = len(line) - len(line.lstrip())
                         result_lines.append(line)
-                    elif in_function and line.strip() and len(line) - len(line.lstrip()) <= indent_level and not line.startswith(' '):
+                    elif in_function and line.strip() and len(line) - len(line.lstrip()) <= indent_level and not line.startswith(b' '):
                         in_function = False
                         result_lines.append(line)
                     else:
                         result_lines.append(line)
                 
-                content = '\n'.join(result_lines)
+                content = b'\n'.join(result_lines)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with open(file_path, 'wb') as f:
             f.write(content)
         
         self.fixes_applied.append("validation.py: Variable original_filename définie")
@@ -163,31 +174,30 @@ class ComprehensiveFixer:
         if not file_path.exists():
             return
             
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = self._read_source_bytes(file_path)
         
         # Corriger la récursion infinie dans _load_yaml_secure
-        problematic_pattern = r'return self\._load_yaml_secure\(content\)'
+        problematic_pattern = rb'return self\._load_yaml_secure\(content\)'
         if problematic_pattern in content:
             content = re.sub(
                 problematic_pattern,
-                'return yaml.safe_load(content) if yaml else None',
+                b'return yaml.safe_load(content) if yaml else None',
                 content
             )
             self.fixes_applied.append("patch_processor_config.py: Récursion YAML corrigée")
         
         # Corriger la logique conditionnelle incorrecte
-        bad_logic = r'yaml\.dump\(" if "if yaml:" not in content else "yaml\.dump\("'
+        bad_logic = rb'yaml\.dump\(" if "if yaml:" not in content else "yaml\.dump\("'
         if re.search(bad_logic, content):
             content = re.sub(
                 bad_logic,
-                'yaml.dump(" if yaml else "# yaml.dump("',
+                b'yaml.dump(" if yaml else "# yaml.dump("',
                 content
             )
             self.fixes_applied.append("patch_processor_config.py: Logique conditionnelle corrigée")
         
         # Simplifier _load_config_file_secure
-        secure_method_pattern = r'def _load_config_file_secure\(self, config_path: Path\) -> Optional\[Dict\]:.*?(?=def|\Z)'
+        secure_method_pattern = rb'def _load_config_file_secure\(self, config_path: Path\) -> Optional\[Dict\]:.*?(?=def|\Z)'
         
         new_secure_method = '''def _load_config_file_secure(self, config_path: Path) -> Optional[Dict]:
         """Charge un fichier de configuration (YAML ou JSON) de manière sécurisée"""
@@ -232,11 +242,11 @@ class ComprehensiveFixer:
             print(f"⚠️ Erreur chargement {config_path}: {e}")
             return None
 
-    '''
+    '''.encode('utf-8')
         
         content = re.sub(secure_method_pattern, new_secure_method, content, flags=re.DOTALL)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with open(file_path, 'wb') as f:
             f.write(content)
         
         self.fixes_applied.append("patch_processor_config.py: Méthode de chargement sécurisée simplifiée")
@@ -283,22 +293,21 @@ class ComprehensiveFixer:
         if not file_path.exists():
             return
             
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = self._read_source_bytes(file_path)
         
         # Compter les occurrences de correct_diff_headers
-        method_count = content.count("def correct_diff_headers(")
+        method_count = content.count(b"def correct_diff_headers(")
         
         if method_count > 1:
             # Garder seulement la première définition complète avec validation
-            lines = content.split('\n')
+            lines = content.split(b'\n')
             result_lines = []
             in_first_method = False
             method_count_seen = 0
             indent_level = 0
             
             for line in lines:
-                if "def correct_diff_headers(" in line:
+                if b"def correct_diff_headers(" in line:
                     method_count_seen += 1
                     if method_count_seen == 1:
                         in_first_method = True
@@ -309,21 +318,21 @@ class ComprehensiveFixer:
                         continue
                 elif in_first_method:
                     # Continuer jusqu'à la fin de la méthode
-                    if line.strip() and not line.startswith(' ' * (indent_level + 1)) and not line.startswith(' ' * indent_level):
+                    if line.strip() and not line.startswith(b' ' * (indent_level + 1)) and not line.startswith(b' ' * indent_level):
                         in_first_method = False
                         result_lines.append(line)
                     else:
                         result_lines.append(line)
                 elif method_count_seen == 1 and not in_first_method:
                     # Après la première méthode, garder tout sauf les autres définitions
-                    if "def correct_diff_headers(" not in line:
+                    if b"def correct_diff_headers(" not in line:
                         result_lines.append(line)
                 else:
                     result_lines.append(line)
             
-            content = '\n'.join(result_lines)
+            content = b'\n'.join(result_lines)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(file_path, 'wb') as f:
                 f.write(content)
             
             self.fixes_applied.append("line_number_corrector.py: Méthodes dupliquées supprimées")
@@ -366,6 +375,23 @@ class ComprehensiveFixer:
         
         print(f"   ✅ {len(self.files_created)} fichiers consolidés créés")
     
+    def _write_consolidated(self, file_name: str, content: str):
+        """Écrit un module consolidé, sauf s'il existe déjà
+
+        Le modèle intégré ne sert qu'à la première consolidation: un module
+        existant a pu évoluer depuis (buffers, statistiques, slots...) et ne
+        doit pas être remplacé par l'ancienne version.
+        """
+        target = self.script_dir / file_name
+        if target.exists():
+            print(f"   ⏭️ {file_name} déjà consolidé, conservé")
+            return
+        
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        self.files_created.append(file_name)
+    
     def _consolidate_cache_system(self):
         """Consolide tous les fichiers du système de cache"""
         cache_files = [
@@ -530,11 +556,7 @@ class CacheManager:
         return key
 '''
         
-        cache_system_file = self.script_dir / "cache_system.py"
-        with open(cache_system_file, 'w', encoding='utf-8') as f:
-            f.write(consolidated_content)
-        
-        self.files_created.append("cache_system.py")
+        self._write_consolidated("cache_system.py", consolidated_content)
     
     def _consolidate_streaming_system(self):
         """Consolide le système de streaming"""
@@ -777,11 +799,7 @@ class StreamingManager:
         }
 '''
         
-        streaming_system_file = self.script_dir / "streaming_system.py"
-        with open(streaming_system_file, 'w', encoding='utf-8') as f:
-            f.write(streaming_content)
-        
-        self.files_created.append("streaming_system.py")
+        self._write_consolidated("streaming_system.py", streaming_content)
     
     def _consolidate_core_types(self):
         """Consolide les types de base"""
@@ -902,11 +920,7 @@ def get_supported_extensions() -> Dict[LanguageType, List[str]]:
     }
 '''
         
-        core_types_file = self.script_dir / "core_types.py"
-        with open(core_types_file, 'w', encoding='utf-8') as f:
-            f.write(types_content)
-        
-        self.files_created.append("core_types.py")
+        self._write_consolidated("core_types.py", types_content)
     
     def _remove_redundant_files(self):
         """Supprime les fichiers redondants et temporaires"""
@@ -956,6 +970,9 @@ def get_supported_extensions() -> Dict[LanguageType, List[str]]:
         # Optimiser les imports longs
         self._optimize_long_imports()
         
+        # Compiler les validateurs en module natif si mypyc est disponible
+        self._build_native_validation()
+        
         print(f"   ✅ Optimisations appliquées")
     
     def _update_imports_for_consolidation(self):
@@ -1078,6 +1095,40 @@ def get_supported_extensions() -> Dict[LanguageType, List[str]]:
             except Exception as e:
                 self.logger.warning(f"Erreur optimisation imports {py_file.name}: {e}")
     
+    def _build_native_validation(self):
+        """Compile validation.py avec mypyc en _validation_c (optionnel, ignoré si absent)"""
+        mypyc = shutil.which("mypyc")
+        if not mypyc:
+            return
+        
+        # Anciens modules compilés sur place: ils masqueraient validation.py
+        for stale in self.script_dir.glob("validation.*.so"):
+            stale.unlink()
+        for stale in self.script_dir.glob("validation.*.pyd"):
+            stale.unlink()
+        
+        source = (self.script_dir / "validation.py").read_bytes()
+        marker = b"# --- Module natif (mypyc) ---"
+        if marker not in source:
+            self.logger.warning("Compilation mypyc ignorée: marqueur absent de validation.py")
+            return
+        
+        # Copie sans le chargeur natif, avec l'empreinte de la source pour détecter les modules obsolètes
+        digest = hashlib.sha256(source).hexdigest()
+        module_source = source[:source.index(marker)] + f"_SOURCE_SHA256 = '{digest}'\n".encode()
+        
+        try:
+            with tempfile.TemporaryDirectory() as build_dir:
+                build_path = Path(build_dir)
+                (build_path / "_validation_c.py").write_bytes(module_source)
+                subprocess.run([mypyc, "_validation_c.py"], cwd=build_path,
+                               check=True, capture_output=True, timeout=600)
+                for built in list(build_path.glob("_validation_c.*.so")) + list(build_path.glob("_validation_c.*.pyd")):
+                    shutil.move(str(built), str(self.script_dir / built.name))
+            self.fixes_applied.append("validation.py: Module natif _validation_c compilé avec mypyc")
+        except (subprocess.SubprocessError, OSError) as e:
+            self.logger.warning(f"Compilation mypyc ignorée: {e}")
+    
     def _validate_fixes(self):
         """Valide que les corrections ont été appliquées correctement"""
         print("\n🧪 Phase 6: Validation des corrections")
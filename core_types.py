@@ -4,9 +4,13 @@ Types de base consolidés pour Smart Patch Processor
 Regroupe: IssueType, LanguageType, LanguageInfo, PatchIssue
 """
 
+import sys
 from enum import Enum
 from dataclasses import dataclass, field
 
+# __slots__ générés par dataclass (Python 3.10+): attributs indexés, pas de __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 # ============================================================================
 # ENUMS DE BASE
 # ============================================================================
@@ -48,7 +52,7 @@ class LanguageInfo:
     features: List[str]
     complexity: int
 
-@dataclass
+@dataclass(**_SLOTS)
 class PatchIssue:
     """Représente un problème détecté dans un patch"""
     type: IssueType
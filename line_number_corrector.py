@@ -4,10 +4,15 @@ from typing import Any, Dict, List, Optional, Protocol, Tuple, Union
 import re
 import logging
 import difflib
+import itertools
+from collections import OrderedDict
 
 from patch_processor_config import PatchProcessorConfig
 from ast_analyzer import ASTAnalyzer
 
+# Lignes de métadonnées retirées par _clean_diff_metadata
+_METADATA_PREFIXES = ('--- ', '+++ ', 'diff --git', 'index ', 'new file', 'deleted file')
+
 class LineNumberCorrector:
     """Responsable de la correction intelligente des numéros de ligne"""
     
@@ -22,7 +27,75 @@ class LineNumberCorrector:
         self.similarity_threshold = correction_config.get('similarity_threshold', 0.7)
         self.fuzzy_search_enabled = correction_config.get('fuzzy_search_enabled', True)
         self.context_window = correction_config.get('context_window', 5)
+        
+        # Cache des headers déjà corrigés (LRU borné)
+        self._header_cache: "OrderedDict[Tuple[str, str, int], Tuple[str, bool]]" = OrderedDict()
+        self._header_cache_size = 1024
+        
+        # Expressions régulières compilées (voir precompile_patterns)
+        self._compiled: Optional[Dict[str, Any]] = None
     
+    def precompile_patterns(self) -> Dict[str, Any]:
+        """Compile une seule fois les expressions régulières du correcteur"""
+        if self._compiled is None:
+            self._compiled = {
+                'header_suffix': re.compile(r'@@\s*-\d+,?\d*\s*\+\d+,?\d*\s*@@(.*)$'),
+                'header_numbers': re.compile(r'@@\s*-(\d+)(?:,(\d+))?\s*\+(\d+)(?:,(\d+))?\s*@@'),
+            }
+        return self._compiled
+    
+    def needs_correction(self, diff_content: str, original_content: str) -> bool:
+        """Pré-contrôle rapide: False si chaque hunk est déjà à sa place
+
+        Pour chaque hunk, les lignes côté ancien (contexte et suppressions)
+        doivent se trouver exactement à -old_start dans original_content et
+        les comptes doivent être exacts. Aucune recherche de position n'est
+        faite. Un diff accepté est appliqué tel quel: les lignes ---/+++ et
+        +new_start ne sont pas normalisées, l'applicateur les ignore.
+        """
+        header_numbers = self.precompile_patterns()['header_numbers']
+        diff_lines = diff_content.split('\n')
+        original_lines = None
+
+        for index, line in enumerate(diff_lines):
+            if not line.startswith('@@'):
+                continue
+
+            match = header_numbers.match(line)
+            if not match:
+                return True
+
+            # Lignes côté ancien du hunk, jusqu'au header suivant
+            old_side = []
+            new_total = 0
+            for hunk_line in itertools.islice(diff_lines, index + 1, None):
+                if hunk_line.startswith('@@'):
+                    break
+                if hunk_line.startswith(('--- ', '+++ ')):
+                    return True  # Métadonnées d'un autre fichier: correction complète
+                if hunk_line.startswith((' ', '-')):
+                    old_side.append(hunk_line[1:].strip())
+                if hunk_line.startswith((' ', '+')):
+                    new_total += 1
+
+            old_count = int(match.group(2)) if match.group(2) else 1
+            new_count = int(match.group(4)) if match.group(4) else 1
+            if (old_count, new_count) != (max(1, len(old_side)), max(1, new_total)):
+                return True
+
+            if not old_side:
+                continue  # Ajout pur: rien à vérifier, header laissé tel quel par le correcteur
+
+            if original_lines is None:
+                original_lines = original_content.split('\n')
+
+            start = int(match.group(1)) - 1
+            window = original_lines[start:start + len(old_side)] if start >= 0 else []
+            if [file_line.strip() for file_line in window] != old_side:
+                return True
+
+        return False
+
     def correct_diff_headers(self, diff_content: str, original_content: str) -> str:
         """Corrige les headers de diff avec validation sécurisée"""
         
@@ -37,8 +110,9 @@ class LineNumberCorrector:
         cleaned_diff = self._clean_diff_metadata(diff_content)
         
         original_lines = original_content.split('\n')
+        original_hash = hash(original_content)
         diff_lines = cleaned_diff.split('\n')
-        corrected_lines = []
+        corrected_lines = [None] * len(diff_lines)  # Chaque slot est écrit une seule fois
         
         i = 0
         corrections_made = 0
@@ -48,16 +122,16 @@ class LineNumberCorrector:
             line = diff_lines[i]
             
             if line.startswith('@@'):
-                corrected_header, context_found = self._fix_single_header(
-                    line, diff_lines, original_lines, i
+                corrected_header, context_found = self._fix_single_header_cached(
+                    line, diff_lines, original_lines, i, original_hash
                 )
-                corrected_lines.append(corrected_header)
+                corrected_lines[i] = corrected_header
                 
                 if corrected_header != line:
                     corrections_made += 1
                     self.logger.debug(f"Correction: {line} → {corrected_header}")
             else:
-                corrected_lines.append(line)
+                corrected_lines[i] = line
             
             i += 1  # Incrémentation explicite et sécurisée
         
@@ -70,6 +144,27 @@ class LineNumberCorrector:
         
     
 
+    def _fix_single_header_cached(self, header_line: str, diff_lines: List[str],
+                                  original_lines: List[str], header_index: int,
+                                  original_hash: int) -> Tuple[str, bool]:
+        """Corrige un header en réutilisant le résultat des hunks identiques"""
+        # Le résultat dépend du header, du corps du hunk et du fichier original
+        hunk_end = header_index + 1
+        while hunk_end < len(diff_lines) and not diff_lines[hunk_end].startswith('@@'):
+            hunk_end += 1
+        key = (header_line, '\n'.join(diff_lines[header_index + 1:hunk_end]), original_hash)
+        
+        cached = self._header_cache.get(key)
+        if cached is not None:
+            self._header_cache.move_to_end(key)
+            return cached
+        
+        result = self._fix_single_header(header_line, diff_lines, original_lines, header_index)
+        self._header_cache[key] = result
+        if len(self._header_cache) > self._header_cache_size:
+            self._header_cache.popitem(last=False)
+        return result
+    
     def _fix_single_header(self, header_line: str, diff_lines: List[str], 
                           original_lines: List[str], header_index: int) -> Tuple[str, bool]:
         """Corrige un seul header de diff"""
@@ -192,7 +287,7 @@ class LineNumberCorrector:
         
         for line in lines:
             # Ignorer les métadonnées
-            if line.startswith(('--- ', '+++ ', 'diff --git', 'index ', 'new file', 'deleted file')):
+            if line.startswith(_METADATA_PREFIXES):
                 self.logger.debug(f"Métadonnée ignorée: {line[:50]}...")
                 continue
             cleaned_lines.append(line)
@@ -202,7 +297,7 @@ class LineNumberCorrector:
                        old_count: int, new_count: int) -> str:
         """Reconstruit le header avec les nouveaux paramètres"""
         # Préserver le suffixe si présent (nom de fonction, etc.)
-        match = re.match(r'@@\s*-\d+,?\d*\s*\+\d+,?\d*\s*@@(.*)$', original_header)
+        match = self.precompile_patterns()['header_suffix'].match(original_header)
         suffix = match.group(1) if match else ''
         
         return f"@@ -{new_line_number},{old_count} +{new_line_number},{new_count} @@{suffix}"
@@ -508,7 +508,7 @@ def run_guided_patching(args, source_path, output_path, target_path):
             try:
                 with open(patch_path, 'r') as f:
                     content = f.read()
-                    lines = len(content.split('\n'))
+                    lines = content.count('\n') + 1
                     print(f"  📊 {lines} lignes, ~{content.count('@@')} section(s)")
 
                     # Analyser les modifications
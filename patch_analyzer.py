@@ -5,7 +5,7 @@ Problème: Analyse incorrecte des patches multi-fichiers
 
 import re
 import logging
-from typing import List, Dict, Set, Tuple, Optional
+from typing import Any, List, Dict, Set, Tuple, Optional
 
 from patch_processor_config import PatchProcessorConfig
 from core_types import IssueType, PatchIssue
@@ -21,6 +21,39 @@ class PatchAnalyzer:
         self.scan_dangerous_patterns = security_config.get('scan_dangerous_patterns', True)
         self.allow_system_calls = security_config.get('allow_system_calls', False)
 
+        # Expressions régulières compilées (voir precompile_patterns)
+        self._compiled: Optional[Dict[str, Any]] = None
+
+    def precompile_patterns(self) -> Dict[str, Any]:
+        """Compile une seule fois les expressions régulières utilisées par l'analyse"""
+        if self._compiled is None:
+            self._compiled = {
+                'header_prefix': re.compile(r'^[\-\+\*]+\s+'),
+                'timestamp': re.compile(r'\s+\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}.*$'),
+                'date': re.compile(r'\s+[A-Z][a-z]{2}\s+[A-Z][a-z]{2}\s+\d+.*$'),
+                'hunk_header': re.compile(r'@@\s*-\d+(?:,\d+)?\s*\+\d+(?:,\d+)?\s*@@'),
+                'hunk_numbers': re.compile(r'@@\s*-(\d+)(?:,(\d+))?\s*\+(\d+)(?:,(\d+))?\s*@@'),
+                'ed_command': re.compile(r'^\d+[acd]\d+'),
+                'dangerous': [
+                    (re.compile(pattern, re.IGNORECASE), message, severity)
+                    for pattern, message, severity in [
+                        (r'eval\s*\(', "Utilisation d'eval() détectée", 3),
+                        (r'exec\s*\(', "Utilisation d'exec() détectée", 3),
+                        (r'__import__\s*\(', "Importation dynamique détectée", 2),
+                        (r'subprocess\..*shell\s*=\s*True', "Exécution shell détectée", 3),
+                        (r'os\.system\s*\(', "Appel système détecté", 3),
+                        (r'password\s*=\s*["\'][^"\']+["\']', "Mot de passe en dur détecté", 2),
+                        (r'secret_key\s*=\s*["\'][^"\']+["\']', "Clé secrète en dur détectée", 3),
+                        (r'api_key\s*=\s*["\'][^"\']+["\']', "Clé API en dur détectée", 2),
+                    ]
+                ],
+                'system': [
+                    re.compile(pattern, re.IGNORECASE)
+                    for pattern in [r'os\.system\(', r'subprocess\.', r'popen\(', r'execv?\(']
+                ],
+            }
+        return self._compiled
+
     def analyze_patch_quality(self, patch_content: str, original_content: str) -> List[PatchIssue]:
         """Analyse complète d'un patch - VERSION CORRIGÉE"""
         self.logger.debug("Analyse de la qualité du patch")
@@ -132,12 +165,14 @@ class PatchAnalyzer:
 
     def _extract_filename_from_header(self, line: str) -> Optional[str]:
         """NOUVEAU: Extrait proprement le nom de fichier d'un en-tête"""
+        patterns = self.precompile_patterns()
+
         # Supprimer le préfixe (---, +++, ***)
-        content = re.sub(r'^[\-\+\*]+\s+', '', line)
+        content = patterns['header_prefix'].sub('', line)
 
         # Supprimer les timestamps et métadonnées
-        content = re.sub(r'\s+\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}.*$', '', content)
-        content = re.sub(r'\s+[A-Z][a-z]{2}\s+[A-Z][a-z]{2}\s+\d+.*$', '', content)
+        content = patterns['timestamp'].sub('', content)
+        content = patterns['date'].sub('', content)
         content = content.split('\t')[0].strip()
 
         # Extraire juste le nom de fichier
@@ -170,13 +205,14 @@ class PatchAnalyzer:
 
         header_count = 0
         hunk_count = 0
+        hunk_header = self.precompile_patterns()['hunk_header']
 
         for i, line in enumerate(lines):
             line_num = i + 1
 
             # CORRECTION: Validation des en-têtes selon le type
             if line.startswith('@@'):
-                if not re.match(r'@@\s*-\d+(?:,\d+)?\s*\+\d+(?:,\d+)?\s*@@', line):
+                if not hunk_header.match(line):
                     issues.append(PatchIssue(
                         type=IssueType.ERROR,
                         line_number=line_num,
@@ -234,7 +270,8 @@ class PatchAnalyzer:
         has_unified_headers = any(line.startswith(('--- ', '+++ ')) for line in lines)
         has_context_headers = any(line.startswith(('*** ', '--- ')) for line in lines)
         has_hunks = any(line.startswith('@@') for line in lines)
-        has_ed_commands = any(re.match(r'^\d+[acd]\d+', line) for line in lines)
+        ed_command = self.precompile_patterns()['ed_command']
+        has_ed_commands = any(ed_command.match(line) for line in lines)
 
         if has_unified_headers and has_hunks:
             return 'unified'
@@ -257,7 +294,7 @@ class PatchAnalyzer:
         original_lines = original_content.split('\n')
 
         # CORRECTION: Validation plus intelligente des numéros de ligne
-        for match in re.finditer(r'@@\s*-(\d+)(?:,(\d+))?\s*\+(\d+)(?:,(\d+))?\s*@@', patch_content):
+        for match in self.precompile_patterns()['hunk_numbers'].finditer(patch_content):
             old_start = int(match.group(1))
             old_count = int(match.group(2)) if match.group(2) else 1
             new_start = int(match.group(3))
@@ -302,16 +339,8 @@ class PatchAnalyzer:
         issues = []
 
         # CORRECTION: Patterns de sécurité plus spécifiques
-        dangerous_patterns = [
-            (r'eval\s*\(', "Utilisation d'eval() détectée", 3),
-            (r'exec\s*\(', "Utilisation d'exec() détectée", 3),
-            (r'__import__\s*\(', "Importation dynamique détectée", 2),
-            (r'subprocess\..*shell\s*=\s*True', "Exécution shell détectée", 3),
-            (r'os\.system\s*\(', "Appel système détecté", 3),
-            (r'password\s*=\s*["\'][^"\']+["\']', "Mot de passe en dur détecté", 2),
-            (r'secret_key\s*=\s*["\'][^"\']+["\']', "Clé secrète en dur détectée", 3),
-            (r'api_key\s*=\s*["\'][^"\']+["\']', "Clé API en dur détectée", 2),
-        ]
+        patterns = self.precompile_patterns()
+        dangerous_patterns = patterns['dangerous']
 
         lines = patch_content.split('\n')
 
@@ -321,7 +350,7 @@ class PatchAnalyzer:
                 content = line[1:]  # Supprimer le +
 
                 for pattern, message, severity in dangerous_patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
+                    if pattern.search(content):
                         issues.append(PatchIssue(
                             type=IssueType.WARNING,
                             line_number=i + 1,
@@ -333,18 +362,13 @@ class PatchAnalyzer:
 
         # CORRECTION: Vérifications spécifiques si les appels système ne sont pas autorisés
         if not self.allow_system_calls:
-            system_patterns = [
-                r'os\.system\(',
-                r'subprocess\.',
-                r'popen\(',
-                r'execv?\('
-            ]
+            system_patterns = patterns['system']
 
             for i, line in enumerate(lines):
                 if line.startswith('+'):
                     content = line[1:]
                     for pattern in system_patterns:
-                        if re.search(pattern, content, re.IGNORECASE):
+                        if pattern.search(content):
                             issues.append(PatchIssue(
                                 type=IssueType.ERROR,
                                 line_number=i + 1,
@@ -86,9 +86,9 @@ class PatchApplicator:
                 if len(diff_content.strip()) == 0:
                     return False
                 
-                # Vérifier que c'est un diff valide
-                if not any(line.startswith(('@@', '---', '+++', '+', '-')) 
-                          for line in diff_content.split('\n')):
+                # Vérifier que c'est un diff valide (une ligne commençant par @@, + ou -)
+                if not (diff_content.startswith(('@@', '+', '-')) or '\n+' in diff_content
+                        or '\n-' in diff_content or '\n@@' in diff_content):
                     return False
             
             return True
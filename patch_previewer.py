@@ -36,7 +36,7 @@ class PatchPreviewer:
         }
         
         # Calcul des statistiques de base
-        orig_lines = len(original_content.split('\n'))
+        orig_lines = original_content.count('\n') + 1
         
         # Simulation simple de l'application du patch
         try:
@@ -1,11 +1,23 @@
 from typing import Any, Dict, List, Optional, Protocol, Tuple, Union
 """Module patch_processor_config.py - Configuration YAML améliorée."""
 
+import hashlib
 import json
+import os
+import tempfile
+try:
+    import orjson
+except ImportError:
+    orjson = None
 try:
     import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    except ImportError:
+        from yaml import SafeLoader, SafeDumper
 except ImportError:
     yaml = None
+    SafeLoader = SafeDumper = None
 import logging
 from pathlib import Path
 
@@ -61,9 +73,66 @@ class PatchProcessorConfig:
         """Version sécurisée"""
         return self._load_config_file_secure(config_path)
     
+    def _json_cache_path(self, config_path: Path) -> Path:
+        """Chemin du cache JSON d'un fichier YAML (dossier de cache utilisateur, clé = chemin)"""
+        cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+        key = hashlib.sha256(str(config_path.resolve()).encode('utf-8', 'surrogatepass')).hexdigest()
+        return Path(cache_home) / 'smart-patch' / 'config' / f'{key}.json'
+    
+    def _load_json_cache(self, config_path: Path) -> Optional[Dict]:
+        """Charge le cache JSON s'il est plus récent que le YAML source"""
+        try:
+            cache_file = self._json_cache_path(config_path)
+            if cache_file.stat().st_mtime < config_path.stat().st_mtime:
+                return None
+            if orjson is not None:
+                config = orjson.loads(cache_file.read_bytes())
+            else:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            return config if isinstance(config, dict) else None
+        except (OSError, ValueError):
+            return None
+    
+    def _write_json_cache(self, config_path: Path, config: Dict) -> None:
+        """Écrit le cache JSON dans le dossier de cache (ignoré si impossible)
+
+        Le cache n'est écrit que si le JSON relu redonne exactement la
+        configuration (clés non textuelles, dates... sinon reparsées depuis le
+        YAML), puis remplacé atomiquement pour les lecteurs concurrents.
+        """
+        try:
+            if orjson is not None:
+                data = orjson.dumps(config)
+                if orjson.loads(data) != config:
+                    return
+            else:
+                data = json.dumps(config, ensure_ascii=False).encode('utf-8')
+                if json.loads(data) != config:
+                    return
+            
+            cache_file = self._json_cache_path(config_path)
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_name, cache_file)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except (OSError, TypeError, ValueError):
+            pass
+    
     def _load_config_file_secure(self, config_path: Path) -> Optional[Dict]:
         """Charge un fichier de configuration (YAML ou JSON) de manière sécurisée"""
         try:
+            # Cache JSON à jour: évite le parsing YAML
+            if yaml is not None and config_path.suffix.lower() in ['.yaml', '.yml']:
+                cached = self._load_json_cache(config_path)
+                if cached is not None:
+                    return cached
+            
             with open(config_path, 'r', encoding='utf-8') as f:
                 content = f.read().strip()
                 if not content:
@@ -79,13 +148,14 @@ class PatchProcessorConfig:
                         print(f"⚠️ PyYAML non disponible, tentative JSON pour {config_path}")
                         return json.loads(content)
                     
-                    # Utiliser safe_load directement (pas de méthode séparée)
-                    config = yaml.safe_load(content)
+                    # Chargement sûr (backend C si disponible)
+                    config = yaml.load(content, Loader=SafeLoader)
                     
                     # Validation de base
                     if not isinstance(config, dict):
                         raise ValueError("Config must be a dictionary")
                     
+                    self._write_json_cache(config_path, config)
                     return config
                     
                 elif config_path.suffix.lower() == '.json':
@@ -94,7 +164,7 @@ class PatchProcessorConfig:
                     # Essayer YAML d'abord, puis JSON
                     try:
                         if yaml:
-                            return yaml.safe_load(content)
+                            return yaml.load(content, Loader=SafeLoader)
                         else:
                             return json.loads(content)
                     except Exception:
@@ -180,7 +250,7 @@ class PatchProcessorConfig:
                 'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             },
             'performance': {
-                'max_concurrent_patches': 2,
+                'max_concurrent_patches': 1,  # > 1: pool de processus (opt-in, voir _MIN_PARALLEL_GROUPS)
                 'memory_limit_mb': 512,
                 'enable_streaming': True,
                 'streaming_threshold_mb': 50,
@@ -272,7 +342,7 @@ class PatchProcessorConfig:
                 if format.lower() in ['yaml', 'yml']:
                     if yaml is None:
                         raise Exception("PyYAML requis pour le format YAML")
-                    yaml.dump(self.config, f, default_flow_style=False, 
+                    yaml.dump(self.config, f, Dumper=SafeDumper, default_flow_style=False,
                              allow_unicode=True, sort_keys=False, indent=2)
                 else:
                     json.dump(self.config, f, indent=2, ensure_ascii=False)
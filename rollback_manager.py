@@ -118,9 +118,9 @@ class RollbackManager:
     def _verify_backup_integrity(self, original_file: Path, backup_file: Path) -> bool:
         """Vérifie l'intégrité du backup"""
         try:
-            return (backup_file.exists() and 
-                   backup_file.stat().st_size > 0 and
-                   backup_file.stat().st_size == original_file.stat().st_size)
+            # Un seul stat par fichier; backup absent -> OSError -> False
+            backup_size = backup_file.stat().st_size
+            return backup_size > 0 and backup_size == original_file.stat().st_size
         except Exception:
             return False
     
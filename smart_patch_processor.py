@@ -1,46 +1,119 @@
-from typing import Any, Dict, List, Optional, Protocol, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple, Union
 """Module smart_patch_processor.py - Classe SmartPatchProcessor."""
 
-import glob
+import os
+import sys
+import functools
+import shutil
 import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import yaml
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
 import logging
 from pathlib import Path
+import time
 from datetime import datetime
-from datetime import datetime, timedelta
-import stat
 import re
+from collections import deque
+from operator import attrgetter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 from processing_result import ProcessingResult
-from permission_config import PermissionConfig
-from streaming_system import StreamingConfig
 from patch_analyzer import PatchAnalyzer
-from git_integration import GitIntegration
 from patch_processor_config import PatchProcessorConfig
-from target_file_detector import TargetFileDetector
-from wizard_mode import WizardMode
-from streaming_system import StreamingManager
+from target_file_detector import PRUNED_DIRECTORIES, TargetFileDetector
 from patch_applicator import PatchApplicator
-from permission_manager import PermissionManager
-from patch_previewer import PatchPreviewer
 from processing_coordinator import ProcessingCoordinator
-from rollback_manager import RollbackManager
-from interactive_cli import InteractiveCLI
 from core_types import PatchIssue
 from colors import Colors
 from line_number_corrector import LineNumberCorrector
 
+# Processeur propre à chaque processus worker (voir process_all_patches)
+_worker_processor = None
+
+# Sentinelles des groupes sans cible: clés (_ORPHAN|_ERROR, chemin du patch)
+_ORPHAN = 'orphan'
+_ERROR = 'error'
+
+GroupKey = Union[Path, Tuple[str, Path]]
+
+# Extensions reconnues comme patches
+_PATCH_EXTS = frozenset({'.patch', '.diff', '.pch'})
+
+# Pool de processus sur demande uniquement (performance.max_concurrent_patches > 1):
+# chaque worker reconstruit un processeur complet et perd ses caches, ce qui ne
+# se rentabilise qu'avec des groupes nombreux et lourds. En dessous de ce nombre
+# de groupes, traitement séquentiel même si le pool est demandé.
+_MIN_PARALLEL_GROUPS = 4
+_REPORT_BUFFER = 64 * 1024
+_PREFETCH_WORKERS = 16
+_RESULT_COMMON = attrgetter('target_file', 'output_file', 'success', 'processing_type', 'errors')
+
+# Métadonnées (horodatages) à retirer des noms de fichiers des en-têtes
+_TS_RE = re.compile(r'\s+\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}.*$')
+_DATE_RE = re.compile(r'\s+[A-Z][a-z]{2}\s+[A-Z][a-z]{2}\s+\d+.*$')
+
+# En-têtes de fichiers (/dev/null ignoré pour ---/+++)
+_HDR_RE = re.compile(r'^(?:(?:---|\+\+\+) (?!.*/dev/null$)(.+)|\*\*\* (.+)|Index: (.+))$')
+
+
+def _init_group_worker(source_dir: str, output_dir: str, verbose: bool,
+                       config_path: Optional[str], target_file: Optional[str]) -> None:
+    """Initialise le processeur d'un worker une seule fois"""
+    global _worker_processor
+    _worker_processor = SmartPatchProcessor(source_dir, output_dir, verbose, config_path, target_file)
+
+
+def _process_groups(groups: List[Tuple[GroupKey, List[Path], Path]]) -> List[ProcessingResult]:
+    """Traite séquentiellement des groupes de patches dans un processus worker
+
+    Chaque groupe arrive avec son chemin de sortie, réservé par le processus parent.
+    """
+    return [_worker_processor._process_group(target_path, target_patches, output_file)
+            for target_path, target_patches, output_file in groups]
+
+
+def _find_file_bfs(root: Path, name: str, max_depth: int = 3) -> Optional[Path]:
+    """Cherche un fichier dans les sous-dossiers de root, du moins profond au plus profond"""
+    pending = deque([(str(root), 0)])
+    while pending:
+        directory, depth = pending.popleft()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if depth and entry.name == name and entry.is_file():
+                        return Path(entry.path)
+                    if depth < max_depth and entry.name not in PRUNED_DIRECTORIES and entry.is_dir():
+                        pending.append((entry.path, depth + 1))
+        except OSError:
+            continue
+    return None
+
+
 class SmartPatchProcessor:
     """Processeur principal de patches avec architecture modulaire"""
 
     def __init__(self, source_dir: str, output_dir: str, verbose: bool = False, config_path: Optional[str] = None, target_file: Optional[str] = None):
         # Configuration
         self.config = PatchProcessorConfig(Path(config_path) if config_path else None)
+        self.config_path = config_path
         self.verbose = verbose
 
-        # Chemins
+        # Paramètres lus une seule fois (chemin critique par patch)
+        self._max_file_bytes = self.config.get('security', 'max_file_size_mb', 10) * 1024 * 1024
+        self._preserve_original = bool(self.config.get('output', 'preserve_original', True))
+        self._report_format = str(self.config.get('output', 'report_format', 'json')).lower()
+
+        # Chemins (répertoire courant figé pour la durée de l'exécution)
         self.source_dir = Path(source_dir)
         self.output_dir = Path(output_dir)
+        self._cwd = Path.cwd()
 
         # Composants
         self.detector = TargetFileDetector(self.source_dir, self.config)
@@ -53,10 +126,28 @@ class SmartPatchProcessor:
 
         # Création du coordinateur
         self._create_coordinator()
+        self._prewarm()
 
         # Attributs manquants ajoutés par le correcteur
         self.target_file = Path(target_file) if target_file else None
 
+        # Caches par exécution, indexés par (chemin, taille, mtime_ns) du patch
+        self._target_cache: Dict[Tuple[str, int, int], Optional[Path]] = {}
+        self._patch_content_cache: Dict[Tuple[str, int, int], str] = {}
+
+        # Tampon de sortie console (voir _emit / _flush_output)
+        self._out_buf: List[str] = []
+
+        # Chemins résolus par (nom de fichier, dossier du patch)
+        self._resolve_cache: Dict[Tuple[str, Path], Path] = {}
+        self._dir_index_cache: Dict[Path, Optional[Tuple[Dict[str, Path], set]]] = {}
+
+        # Contenus lus lors du regroupement, transmis au traitement individuel
+        self._grouped_contents: Dict[Path, str] = {}
+
+        # Noms déjà présents dans le dossier de sortie (chargés au premier besoin)
+        self._existing_outputs: Optional[set] = None
+
         # État du processeur
         self.processed_patches = []
         self.processing_stats = {
@@ -72,22 +163,19 @@ class SmartPatchProcessor:
         targets = []
 
         # Analyser le patch pour identifier tous les fichiers
-        lines = patch_content.split('\n')
         current_files = set()
 
-        for line in lines:
+        for line in patch_content.splitlines():
+            # Filtre bon marché: les lignes de contenu ne peuvent pas être des en-têtes
+            if line[:1] not in ('-', '+', '*', 'I'):
+                continue
             line = line.strip()
 
             # Détecter les en-têtes de fichiers
-            filename = None
-            if line.startswith('--- ') and not line.endswith('/dev/null'):
-                filename = self._extract_clean_filename(line[4:])
-            elif line.startswith('+++ ') and not line.endswith('/dev/null'):
-                filename = self._extract_clean_filename(line[4:])
-            elif line.startswith('*** '):
-                filename = self._extract_clean_filename(line[4:])
-            elif line.startswith('Index: '):
-                filename = self._extract_clean_filename(line[7:])
+            match = _HDR_RE.match(line)
+            if not match:
+                continue
+            filename = self._extract_clean_filename(match.group(1) or match.group(2) or match.group(3))
 
             if filename and filename not in current_files:
                 # Résoudre le nom de fichier vers un chemin réel
@@ -99,12 +187,65 @@ class SmartPatchProcessor:
 
         # Fallback vers la détection classique si rien trouvé
         if not targets:
-            classic_target = self.detector.detect_target_file(patch_path, patch_content)
+            classic_target = self._detect_target_cached(patch_path, patch_content)
             if classic_target:
                 targets.append(classic_target)
 
         return targets
 
+    def _patch_cache_key(self, patch_path: Path) -> Tuple[str, int, int]:
+        """Clé de cache d'un patch, invalidée si le fichier change"""
+        st = patch_path.stat()
+        return (str(patch_path), st.st_size, st.st_mtime_ns)
+
+    def _read_patch(self, patch_path: Path) -> str:
+        """Lit un patch une seule fois par exécution"""
+        key = self._patch_cache_key(patch_path)
+        content = self._patch_content_cache.get(key)
+        if content is None:
+            with open(patch_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            self._patch_content_cache[key] = content
+        return content
+
+    def _read_patch_batch(self, paths: List[Path]) -> None:
+        """Lit un lot de patches dans le cache (une tâche par lot plutôt que par fichier)"""
+        for path in paths:
+            try:
+                # Les patches trop volumineux seront rejetés sans être lus
+                if path.stat().st_size > self._max_file_bytes:
+                    continue
+                self._read_patch(path)
+            except (OSError, UnicodeDecodeError) as e:
+                # L'erreur sera signalée lors de la lecture séquentielle
+                self.logger.debug(f"Préchargement ignoré pour {path.name}: {e}")
+
+    def _prefetch_patch_contents(self, paths: List[Path]) -> None:
+        """Précharge en parallèle le contenu des patches dans le cache de lecture
+
+        Les contenus restent en mémoire jusqu'à _release_patch_contents().
+        """
+        if not paths:
+            return
+
+        workers = min(_PREFETCH_WORKERS, len(paths))
+        batches = [paths[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list(): propage les exceptions inattendues des lots
+            list(executor.map(self._read_patch_batch, batches))
+
+    def _release_patch_contents(self) -> None:
+        """Libère les contenus de patches gardés pour l'exécution terminée"""
+        self._patch_content_cache.clear()
+        self._grouped_contents.clear()
+
+    def _detect_target_cached(self, patch_path: Path, patch_content: str) -> Optional[Path]:
+        """Détecte le fichier cible d'un patch en mémorisant le résultat"""
+        key = self._patch_cache_key(patch_path)
+        if key not in self._target_cache:
+            self._target_cache[key] = self.detector.detect_target_file(patch_path, patch_content)
+        return self._target_cache[key]
+
     def _extract_clean_filename(self, raw_filename: str) -> str:
         """NOUVEAU: Extrait et nettoie un nom de fichier des métadonnées"""
         if not raw_filename:
@@ -112,8 +253,8 @@ class SmartPatchProcessor:
 
         # Supprimer les timestamps et métadonnées
         filename = raw_filename.strip()
-        filename = re.sub(r'\s+\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}.*$', '', filename)
-        filename = re.sub(r'\s+[A-Z][a-z]{2}\s+[A-Z][a-z]{2}\s+\d+.*$', '', filename)
+        filename = _TS_RE.sub('', filename)
+        filename = _DATE_RE.sub('', filename)
         filename = filename.split('\t')[0].strip()
 
         # Extraire juste le nom de fichier (pas le chemin complet)
@@ -134,80 +275,98 @@ class SmartPatchProcessor:
         if not filename:
             return None
 
+        cache_key = (filename, patch_path.parent)
+        cached = self._resolve_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Rechercher dans plusieurs répertoires
         search_dirs = [
-            Path.cwd(),                           # Répertoire courant
+            self._cwd,                            # Répertoire courant
             patch_path.parent,                    # Répertoire du patch
             self.source_dir if self.source_dir.is_dir() else self.source_dir.parent,
         ]
 
         # Ajouter des sous-répertoires courants si ils existent
-        for base in [Path.cwd(), patch_path.parent]:
+        for base in [self._cwd, patch_path.parent]:
+            base_index = self._dir_index(base)
             for subdir in ['src', 'ui', 'lib', 'app', 'core']:
-                subdir_path = base / subdir
-                if subdir_path.exists():
-                    search_dirs.append(subdir_path)
+                if base_index is not None and subdir in base_index[1]:
+                    search_dirs.append(base / subdir)
 
-        # Rechercher le fichier
-        for search_dir in search_dirs:
-            if not search_dir.exists():
+        # Rechercher le fichier (chaque arborescence n'est parcourue qu'une fois)
+        for search_dir in dict.fromkeys(search_dirs):
+            index = self._dir_index(search_dir)
+            if index is None:
                 continue
 
             # Recherche exacte
-            target_path = search_dir / filename
-            if target_path.exists() and target_path.is_file():
+            target_path = index[0].get(filename)
+            if target_path is not None:
+                self._resolve_cache[cache_key] = target_path
                 return target_path
 
-            # Recherche récursive limitée
-            for depth in range(1, 4):
-                pattern = "*/" * depth + filename
-                try:
-                    for found_path in search_dir.glob(pattern):
-                        if found_path.is_file():
-                            return found_path
-                except Exception:
-                    continue
+            # Recherche récursive limitée (3 niveaux), un seul scandir par dossier
+            found_path = _find_file_bfs(search_dir, filename)
+            if found_path:
+                self._resolve_cache[cache_key] = found_path
+                return found_path
 
         return None
 
-        # Composants optionnels
-        try:
-            self.rollback_manager = RollbackManager(self.config)
-        except:
-            self.rollback_manager = None
-
-        try:
-            self.previewer = PatchPreviewer(self.config)
-        except:
-            self.previewer = None
-
-        try:
-            self.git_integration = GitIntegration(self.config)
-        except:
-            self.git_integration = None
-
-        try:
-            self.interactive_cli = InteractiveCLI(self.config, self)
-        except:
-            self.interactive_cli = None
-
-        try:
-            permission_config = PermissionConfig()
-            self.permission_manager = PermissionManager(permission_config)
-        except:
-            self.permission_manager = None
-
-        try:
-            streaming_config = StreamingConfig()
-            self.streaming_manager = StreamingManager(streaming_config)
-        except:
-            self.streaming_manager = None
-
-        try:
-            self.wizard_mode = WizardMode(self, self.config)
-        except:
-            self.wizard_mode = None
-
+    def _dir_index(self, directory: Path) -> Optional[Tuple[Dict[str, Path], set]]:
+        """Fichiers (nom -> chemin) et sous-dossiers d'un dossier, lus une fois par exécution"""
+        if directory not in self._dir_index_cache:
+            try:
+                files, subdirs = {}, set()
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            files[entry.name] = Path(entry.path)
+                        elif entry.is_dir():
+                            subdirs.add(entry.name)
+                self._dir_index_cache[directory] = (files, subdirs)
+            except OSError:
+                self._dir_index_cache[directory] = None
+        return self._dir_index_cache[directory]
+
+    # Composants optionnels, construits (et importés) au premier accès
+
+    @functools.cached_property
+    def rollback_manager(self):
+        from rollback_manager import RollbackManager
+        return RollbackManager(self.config)
+
+    @functools.cached_property
+    def previewer(self):
+        from patch_previewer import PatchPreviewer
+        return PatchPreviewer(self.config)
+
+    @functools.cached_property
+    def git_integration(self):
+        from git_integration import GitIntegration
+        return GitIntegration(self.config)
+
+    @functools.cached_property
+    def interactive_cli(self):
+        from interactive_cli import InteractiveCLI
+        return InteractiveCLI(self.config, self)
+
+    @functools.cached_property
+    def permission_manager(self):
+        from permission_config import PermissionConfig
+        from permission_manager import PermissionManager
+        return PermissionManager(PermissionConfig())
+
+    @functools.cached_property
+    def streaming_manager(self):
+        from streaming_system import StreamingConfig, StreamingManager
+        return StreamingManager(StreamingConfig())
+
+    @functools.cached_property
+    def wizard_mode(self):
+        from wizard_mode import WizardMode
+        return WizardMode(self, self.config)
 
     def _create_coordinator(self) -> None:
         """Crée un coordinateur avec les composants existants"""
@@ -219,6 +378,11 @@ class SmartPatchProcessor:
         }
         self.coordinator = ProcessingCoordinator(self.config, components)
 
+    def _prewarm(self) -> None:
+        """Compile les expressions régulières une fois avant la boucle de traitement"""
+        self.analyzer.precompile_patterns()
+        self.corrector.precompile_patterns()
+
     def process_with_pipeline(self, patch_path: Path, target_file: Optional[Path] = None):
         """Utilise le nouveau pipeline pour traiter un patch"""
         return self.coordinator.coordinate_single_patch(patch_path, target_file)
@@ -260,40 +424,65 @@ class SmartPatchProcessor:
                 content = f.read()
                 return processor_func(content)
 
+    def _read_text(self, file_path: Path) -> str:
+        """Lit un fichier texte UTF-8 en une lecture binaire suivie d'un décodage"""
+        with open(file_path, 'rb') as f:
+            text = f.read().decode('utf-8')
+
+        # Mêmes fins de ligne qu'une lecture en mode texte
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
     def find_patches(self) -> List[Path]:
         """Trouver tous les patches dans le dossier source"""
-        patch_extensions = ['*.patch', '*.diff', '*.pch']
         patches = []
 
         if self.source_dir.is_file():
             patches = [self.source_dir]
         else:
-            for pattern in patch_extensions:
-                patches.extend(self.source_dir.glob(pattern))
-                patches.extend(self.source_dir.glob(f"**/{pattern}"))
+            # Parcours unique de l'arborescence (pile explicite)
+            pending = [self.source_dir]
+            while pending:
+                try:
+                    with os.scandir(pending.pop()) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif os.path.splitext(entry.name)[1] in _PATCH_EXTS and entry.is_file():
+                                patches.append(Path(entry.path))
+                except OSError as e:
+                    self.logger.debug(f"Répertoire ignoré: {e}")
 
         self.logger.debug(f"{len(patches)} patch(es) trouvé(s)")
-        return sorted(patches)
-
-    def process_single_patch(self, patch_path: Path, explicit_target: Optional[Path] = None) -> ProcessingResult:
-        """Traiter un seul patch"""
+        # L'ordre détermine l'application cumulative: tri conservé, sur les
+        # tuples de composants plutôt que par comparaisons de Path
+        patches.sort(key=lambda path: path.parts)
+        return patches
+
+    def process_single_patch(self, patch_path: Path, explicit_target: Optional[Path] = None, *,
+                             patch_content: Optional[str] = None,
+                             target_content: Optional[str] = None,
+                             known_target: Optional[Path] = None,
+                             output_file: Optional[Path] = None) -> ProcessingResult:
+        """Traiter un seul patch (contenus déjà lus transmis pour éviter une relecture)"""
         result = ProcessingResult(
             patch_file=str(patch_path),
             processing_type="individual"
         )
+        target_file = None
 
         try:
             self.logger.debug(f"Traitement du patch: {patch_path.name}")
 
-            # Vérifier la taille du fichier
-            max_size = self.config.get('security', 'max_file_size_mb', 10) * 1024 * 1024
-            if patch_path.stat().st_size > max_size:
-                result.errors.append(f"Fichier trop volumineux (>{max_size} bytes)")
+            # Vérifier la taille du fichier (en octets, même si le contenu est déjà lu)
+            if patch_path.stat().st_size > self._max_file_bytes:
+                result.errors.append(f"Fichier trop volumineux (>{self._max_file_bytes} bytes)")
                 return result
 
             # Lire le patch
-            with open(patch_path, 'r', encoding='utf-8') as f:
-                patch_content = f.read()
+            if patch_content is None:
+                patch_content = self._read_patch(patch_path)
 
             # CORRECTION: Détection améliorée des fichiers cibles
             if explicit_target and explicit_target.exists():
@@ -302,6 +491,9 @@ class SmartPatchProcessor:
             elif hasattr(self, "target_file") and self.target_file and self.target_file.exists():
                 target_files = [self.target_file]
                 self.logger.debug(f"Utilisation du fichier cible de l\'instance: {self.target_file}")
+            elif known_target is not None:
+                # Cible déjà détectée lors du regroupement
+                target_files = [known_target]
             else:
                 # NOUVEAU: Détecter tous les fichiers cibles possibles
                 target_files = self.detect_patch_targets_improved(patch_content, patch_path)
@@ -318,36 +510,43 @@ class SmartPatchProcessor:
             result.target_file = str(target_file)
 
             # Lire le fichier original
-            with open(target_file, 'r', encoding='utf-8') as f:
-                original_content = f.read()
+            if target_content is None:
+                original_content = self._read_text(target_file)
+            else:
+                original_content = target_content
+
+            # Compté sur le texte déjà décodé: aucune seconde lecture du fichier
+            original_lines = original_content.count('\n') + 1
 
             # Analyser le patch
             issues = self.analyzer.analyze_patch_quality(patch_content, original_content)
             result.issues = issues
 
-            # Corriger les numéros de ligne
-            corrected_patch = self.corrector.correct_diff_headers(patch_content, original_content)
+            # Corriger les numéros de ligne (inutile si les headers sont déjà exacts)
+            if self.corrector.needs_correction(patch_content, original_content):
+                corrected_patch = self.corrector.correct_diff_headers(patch_content, original_content)
+            else:
+                corrected_patch = patch_content
 
             # Appliquer le patch
             corrected_content = self.applicator.apply_patch(original_content, corrected_patch)
 
-            # Sauvegarder le résultat
-            output_file = self._get_unique_output_path(target_file)
+            # Sauvegarder le résultat (chemin éventuellement réservé par le processus parent)
+            if output_file is None:
+                output_file = self._get_unique_output_path(target_file)
 
             # Optionnel: créer une sauvegarde
-            if self.config.get('output', 'preserve_original', True):
+            if self._preserve_original:
                 backup_file = output_file.with_suffix(output_file.suffix + '.backup')
-                with open(backup_file, 'w', encoding='utf-8') as f:
-                    f.write(original_content)
+                self._backup_file(target_file, backup_file)
 
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(corrected_content)
+            output_file.write_bytes(corrected_content.encode('utf-8'))
 
             result.output_file = str(output_file)
             result.success = True
 
             # Statistiques
-            result.stats = self._calculate_stats(original_content, corrected_content, issues)
+            result.stats = self._calculate_stats(original_lines, corrected_content.count('\n') + 1, issues)
 
             self.logger.debug(f"Patch appliqué avec succès: {output_file}")
 
@@ -356,17 +555,28 @@ class SmartPatchProcessor:
             result.errors.append(str(e))
 
             # Restaurer les permissions en cas d'erreur si configuré
-            if self.permission_manager.config.auto_restore_on_failure and target_file:
-                try:
-                    self.permission_manager.restore_file_permissions(target_file)
-                    self.user_message(f"Permissions restaurées pour {target_file.name} après erreur", "info")
-                except Exception as e:
-                    self.logger.debug(f"Erreur non-critique ignorée: {e}")
+            if target_file:
+                self._restore_permissions_after_failure(target_file)
 
 
         return result
 
-    def process_cumulative_patches(self, target_file: Path, patches: List[Path]) -> ProcessingResult:
+    def _restore_permissions_after_failure(self, target_file: Path) -> None:
+        """Restaure les permissions d'une cible après un échec de traitement"""
+        import sqlite3  # Uniquement sur le chemin d'erreur
+
+        try:
+            permission_manager = self.permission_manager
+        except (ImportError, OSError, sqlite3.Error) as e:
+            self.logger.debug(f"Gestionnaire de permissions indisponible: {e}")
+            return
+
+        if permission_manager and getattr(permission_manager.config, 'auto_restore_on_failure', False):
+            if permission_manager.restore_file_permissions(target_file):
+                self.user_message(f"Permissions restaurées pour {target_file.name} après erreur", "info")
+
+    def process_cumulative_patches(self, target_file: Path, patches: List[Path],
+                                   output_file: Optional[Path] = None) -> ProcessingResult:
         """Appliquer plusieurs patches de manière cumulative sur un même fichier"""
         result = ProcessingResult(
             target_file=str(target_file),
@@ -378,48 +588,52 @@ class SmartPatchProcessor:
             self.user_message(f"Application cumulative de {len(patches)} patch(es) sur {target_file.name}", "debug")
 
             # Lire le fichier original
-            with open(target_file, 'r', encoding='utf-8') as f:
-                current_content = f.read()
+            current_content = self._read_text(target_file)
             original_content = current_content
 
+            # Point de départ compté sur le texte déjà décodé
+            original_line_count = current_content.count('\n') + 1
+
             all_issues = []
             total_modifications = 0
+            prev_lines = original_line_count
 
             # Appliquer chaque patch séquentiellement
             for i, patch_path in enumerate(patches, 1):
                 self.logger.debug(f"Application du patch {i}/{len(patches)}: {patch_path.name}")
 
                 # Lire le patch
-                with open(patch_path, 'r', encoding='utf-8') as f:
-                    patch_content = f.read()
+                patch_content = self._read_patch(patch_path)
 
                 # Analyser le patch
                 issues = self.analyzer.analyze_patch_quality(patch_content, current_content)
                 all_issues.extend(issues)
 
                 # Corriger et appliquer le patch
-                corrected_patch = self.corrector.correct_diff_headers(patch_content, current_content)
+                if self.corrector.needs_correction(patch_content, current_content):
+                    corrected_patch = self.corrector.correct_diff_headers(patch_content, current_content)
+                else:
+                    corrected_patch = patch_content
                 new_content = self.applicator.apply_patch(current_content, corrected_patch)
 
                 # Compter les modifications
-                lines_before = len(current_content.split('\n'))
-                lines_after = len(new_content.split('\n'))
-                total_modifications += abs(lines_after - lines_before)
+                new_lines = new_content.count('\n') + 1
+                total_modifications += abs(new_lines - prev_lines)
+                prev_lines = new_lines
 
                 # Mettre à jour le contenu pour le prochain patch
                 current_content = new_content
 
-            # Sauvegarder le résultat final
-            output_file = self._get_unique_output_path(target_file, suffix='_cumulative')
+            # Sauvegarder le résultat final (chemin éventuellement réservé par le processus parent)
+            if output_file is None:
+                output_file = self._get_unique_output_path(target_file, suffix='_cumulative')
 
             # Sauvegarde optionnelle
-            if self.config.get('output', 'preserve_original', True):
+            if self._preserve_original:
                 backup_file = output_file.with_suffix(output_file.suffix + '.backup')
-                with open(backup_file, 'w', encoding='utf-8') as f:
-                    f.write(original_content)
+                self._backup_file(target_file, backup_file)
 
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(current_content)
+            output_file.write_bytes(current_content.encode('utf-8'))
 
             result.output_file = str(output_file)
             result.success = True
@@ -427,9 +641,9 @@ class SmartPatchProcessor:
 
             # Statistiques cumulatives
             result.stats = {
-                'original_lines': len(original_content.split('\n')),
-                'final_lines': len(current_content.split('\n')),
-                'total_lines_diff': len(current_content.split('\n')) - len(original_content.split('\n')),
+                'original_lines': original_line_count,
+                'final_lines': prev_lines,
+                'total_lines_diff': prev_lines - original_line_count,
                 'patches_applied': len(patches),
                 'total_issues_fixed': len(all_issues),
                 'total_modifications': total_modifications
@@ -445,29 +659,25 @@ class SmartPatchProcessor:
 
         return result
 
-    def group_patches_by_target(self, patches: List[Path]) -> Dict[str, List[Path]]:
+    def group_patches_by_target(self, patches: List[Path]) -> Dict[GroupKey, List[Path]]:
         """Grouper les patches par fichier cible"""
-        groups = {}
+        groups: Dict[GroupKey, List[Path]] = {}
 
         for patch_path in patches:
             try:
-                with open(patch_path, 'r', encoding='utf-8') as f:
-                    patch_content = f.read()
+                # Contenu préchargé: servi par le cache de lecture
+                patch_content = self._read_patch(patch_path)
+                self._grouped_contents[patch_path] = patch_content
+                target_file = self._detect_target_cached(patch_path, patch_content)
 
-                target_file = self.detector.detect_target_file(patch_path, patch_content)
                 if target_file:
-                    target_key = str(target_file)
-                    if target_key not in groups:
-                        groups[target_key] = []
-                    groups[target_key].append(patch_path)
+                    groups.setdefault(target_file, []).append(patch_path)
                 else:
                     # Patches orphelins
-                    orphan_key = f"orphan_{patch_path.name}"
-                    groups[orphan_key] = [patch_path]
+                    groups[(_ORPHAN, patch_path)] = [patch_path]
             except Exception as e:
                 self.logger.warning(f"Erreur lecture {patch_path.name}: {e}")
-                error_key = f"error_{patch_path.name}"
-                groups[error_key] = [patch_path]
+                groups[(_ERROR, patch_path)] = [patch_path]
 
         return groups
 
@@ -488,14 +698,14 @@ class SmartPatchProcessor:
 
     def process_all_patches(self) -> Dict:
         """Traiter tous les patches trouvés ou un patch spécifique"""
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
 
         # Mode patch explicite avec fichier cible
         if self.source_dir.is_file() and self.target_file:
             self.logger.info("Mode patch explicite avec fichier cible spécifié")
             result = self.process_explicit_patch(self.source_dir, self.target_file)
 
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = (time.perf_counter_ns() - start_ns) / 1e9
             success_count = 1 if result.success else 0
 
             self._print_single_result(result)
@@ -515,52 +725,37 @@ class SmartPatchProcessor:
             self.logger.error(f"Aucun patch trouvé dans {self.source_dir}")
             return {'total': 0, 'success': 0, 'failed': 0, 'results': []}
 
+        # Lectures groupées avant la boucle de traitement
+        self._prefetch_patch_contents(patches)
+
         # Grouper les patches par fichier cible
         groups = self.group_patches_by_target(patches)
 
         print(f"{Colors.BLUE}📦 Traitement de {len(patches)} patch(es) groupé(s) en {len(groups)} cible(s)...{Colors.END}\n")
 
-        results = []
-        success_count = 0
-        total_issues_fixed = 0
-
-        for i, (target_path, target_patches) in enumerate(groups.items(), 1):
-            print(f"{Colors.CYAN}[{i}/{len(groups)}] 🎯 Cible: {Path(target_path).name if not target_path.startswith(('orphan_', 'error_')) else target_path}{Colors.END}")
-
-            if len(target_patches) == 1:
-                # Un seul patch pour cette cible
-                result = self.process_single_patch(target_patches[0])
-            else:
-                # Plusieurs patches pour la même cible - application cumulative
-                if not target_path.startswith(('orphan_', 'error_')):
-                    target_file = Path(target_path)
-                    result = self.process_cumulative_patches(target_file, target_patches)
-                else:
-                    # Patches orphelins - traiter individuellement
-                    result = self.process_single_patch(target_patches[0])
+        max_workers = min(self.config.get('performance', 'max_concurrent_patches', 1) or 1,
+                          os.cpu_count() or 1, len(groups))
+        if max_workers > 1 and len(groups) >= _MIN_PARALLEL_GROUPS:
+            results = self._process_groups_parallel(groups, max_workers)
+        else:
+            results = []
+            for i, (target_key, target_patches) in enumerate(groups.items(), 1):
+                result = self._process_group(target_key, target_patches)
+                self._print_group_result(i, len(groups), target_key, result)
+                results.append(result)
 
-            results.append(result)
+        # Tous les groupes sont traités: les corps de patches ne servent plus
+        self._release_patch_contents()
 
+        success_count = 0
+        total_issues_fixed = 0
+        for result in results:
             if result.success:
                 success_count += 1
-                issues_count = len(result.issues)
-                total_issues_fixed += issues_count
-
-                if result.processing_type == "cumulative":
-                    patches_applied = result.stats.get('patches_applied', 1)
-                    print(f"{Colors.GREEN}   ✅ Succès: {patches_applied} patch(es) appliqué(s) → {result.output_file}{Colors.END}")
-                else:
-                    print(f"{Colors.GREEN}   ✅ Succès: {result.output_file}{Colors.END}")
-
-                if issues_count > 0:
-                    print(f"{Colors.YELLOW}   🔧 {issues_count} problème(s) corrigé(s){Colors.END}")
-            else:
-                print(f"{Colors.RED}   ❌ Échec: {', '.join(result.errors)}{Colors.END}")
-
-            print()
+                total_issues_fixed += len(result.issues)
 
         # Calculer le temps de traitement
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
         # Mettre à jour les statistiques
         self.processing_stats.update({
@@ -583,35 +778,177 @@ class SmartPatchProcessor:
             'processing_time': processing_time
         }
 
+    @staticmethod
+    def _group_label(target_key: GroupKey) -> str:
+        """Nom affiché d'un groupe: nom du fichier cible ou sentinelle_nom du patch"""
+        if isinstance(target_key, Path):
+            return target_key.name
+        kind, patch_path = target_key
+        return f"{kind}_{patch_path.name}"
+
+    def _process_group(self, target_key: GroupKey, target_patches: List[Path],
+                       output_file: Optional[Path] = None) -> ProcessingResult:
+        """Traite un groupe de patches visant la même cible"""
+        if len(target_patches) == 1:
+            # Un seul patch pour cette cible: contenu et cible connus depuis le regroupement
+            patch_path = target_patches[0]
+            return self.process_single_patch(
+                patch_path,
+                patch_content=self._grouped_contents.get(patch_path),
+                known_target=target_key if isinstance(target_key, Path) else None,
+                output_file=output_file)
+
+        # Plusieurs patches pour la même cible - application cumulative
+        if isinstance(target_key, Path):
+            return self.process_cumulative_patches(target_key, target_patches, output_file)
+
+        # Patches orphelins - traiter individuellement
+        return self.process_single_patch(target_patches[0],
+                                         patch_content=self._grouped_contents.get(target_patches[0]))
+
+    def _reserve_group_output(self, target_key: GroupKey, target_patches: List[Path]) -> Optional[Path]:
+        """Réserve le chemin de sortie d'un groupe (None si la cible dépend d'une détection)"""
+        if len(target_patches) > 1 and isinstance(target_key, Path):
+            return self._get_unique_output_path(target_key, suffix='_cumulative')
+
+        # Même priorité que process_single_patch: la cible de l'instance l'emporte
+        if self.target_file and self.target_file.exists():
+            return self._get_unique_output_path(self.target_file)
+        if isinstance(target_key, Path):
+            return self._get_unique_output_path(target_key)
+        return None
+
+    def _process_groups_parallel(self, groups: Dict[GroupKey, List[Path]],
+                                 max_workers: int) -> List[ProcessingResult]:
+        """Répartit les groupes entre plusieurs processus, résultats dans l'ordre des groupes"""
+        keys = list(groups)
+        results: List[Optional[ProcessingResult]] = [None] * len(keys)
+
+        # Les noms de sortie sont attribués ici, avant tout envoi: deux workers ne
+        # peuvent pas obtenir le même. Les groupes sans cible connue (orphelins,
+        # erreurs de lecture) restent dans ce processus, traités après les autres.
+        reserved: Dict[int, Path] = {}
+        local_indexes: List[int] = []
+        for index, key in enumerate(keys):
+            output_file = self._reserve_group_output(key, groups[key])
+            if output_file is None:
+                local_indexes.append(index)
+            else:
+                reserved[index] = output_file
+
+        initargs = (str(self.source_dir), str(self.output_dir), self.verbose, self.config_path,
+                    str(self.target_file) if self.target_file else None)
+        completed = 0
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_group_worker,
+                                 initargs=initargs) as executor:
+            futures = {
+                executor.submit(_process_groups, [(keys[index], groups[keys[index]], output_file)]): index
+                for index, output_file in reserved.items()
+            }
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()[0]
+                except Exception as e:
+                    self.logger.error(f"Erreur worker pour {self._group_label(keys[index])}: {e}")
+                    result = ProcessingResult(patch_file=str(groups[keys[index]][0]))
+                    result.errors.append(str(e))
+
+                results[index] = result
+                completed += 1
+                self._print_group_result(completed, len(keys), keys[index], result)
+
+        for index in local_indexes:
+            result = self._process_group(keys[index], groups[keys[index]])
+            results[index] = result
+            completed += 1
+            self._print_group_result(completed, len(keys), keys[index], result)
+
+        return results
+
+    def _print_group_result(self, position: int, total: int, target_key: GroupKey,
+                            result: ProcessingResult) -> None:
+        """Affiche la progression et le résultat d'un groupe"""
+        self._emit(f"{Colors.CYAN}[{position}/{total}] 🎯 Cible: {self._group_label(target_key)}{Colors.END}")
+
+        if result.success:
+            issues_count = len(result.issues)
+
+            if result.processing_type == "cumulative":
+                patches_applied = result.stats.get('patches_applied', 1)
+                self._emit(f"{Colors.GREEN}   ✅ Succès: {patches_applied} patch(es) appliqué(s) → {result.output_file}{Colors.END}")
+            else:
+                self._emit(f"{Colors.GREEN}   ✅ Succès: {result.output_file}{Colors.END}")
+
+            if issues_count > 0:
+                self._emit(f"{Colors.YELLOW}   🔧 {issues_count} problème(s) corrigé(s){Colors.END}")
+        else:
+            self._emit(f"{Colors.RED}   ❌ Échec: {', '.join(result.errors)}{Colors.END}")
+
+        self._emit("")
+        self._flush_output()
+
+    def _emit(self, *lines: str) -> None:
+        """Ajoute des lignes au tampon de sortie console"""
+        self._out_buf.extend(lines)
+
+    def _flush_output(self) -> None:
+        """Écrit le tampon de sortie console en un seul appel"""
+        if self._out_buf:
+            sys.stdout.write('\n'.join(self._out_buf) + '\n')
+            self._out_buf.clear()
+
+    def _backup_file(self, source: Path, backup_file: Path) -> None:
+        """Sauvegarde un fichier par copie réelle (octets et métadonnées)
+
+        Pas de lien physique: une écriture en place de la cible modifierait
+        aussi la sauvegarde.
+        """
+        shutil.copy2(source, backup_file)
+
     def _get_unique_output_path(self, target_file: Path, suffix: str = '') -> Path:
         """Génère un chemin de sortie unique pour éviter les collisions"""
+        if self._existing_outputs is None:
+            try:
+                self._existing_outputs = {entry.name for entry in os.scandir(self.output_dir)}
+            except OSError:
+                self._existing_outputs = set()
+
         base_name = target_file.stem + suffix
         extension = target_file.suffix
-        output_file = self.output_dir / f"{base_name}{extension}"
+        name = f"{base_name}{extension}"
 
         counter = 1
-        while output_file.exists():
-            output_file = self.output_dir / f"{base_name}_{counter}{extension}"
+        while name in self._existing_outputs:
+            name = f"{base_name}_{counter}{extension}"
             counter += 1
 
-        return output_file
+        self._existing_outputs.add(name)
+        return self.output_dir / name
 
-    def _calculate_stats(self, original_content: str, final_content: str,
+    def _calculate_stats(self, original_lines: int, final_lines: int,
                         issues: List[PatchIssue]) -> Dict:
-        """Calcule les statistiques pour un patch"""
-        original_lines = len(original_content.split('\n'))
-        final_lines = len(final_content.split('\n'))
+        """Calcule les statistiques pour un patch (comptes de lignes fournis par l'appelant)"""
+        # Un seul parcours pour la répartition par sévérité et les corrections automatiques
+        severities = [0, 0, 0, 0]
+        auto_fixable = 0
+        for issue in issues:
+            if 0 <= issue.severity <= 3:
+                severities[issue.severity] += 1
+            if issue.auto_fixable:
+                auto_fixable += 1
 
         return {
             'original_lines': original_lines,
             'final_lines': final_lines,
             'lines_diff': final_lines - original_lines,
             'issues_fixed': len(issues),
-            'auto_fixable_issues': len([i for i in issues if i.auto_fixable]),
+            'auto_fixable_issues': auto_fixable,
             'severity_breakdown': {
-                'high': len([i for i in issues if i.severity == 3]),
-                'medium': len([i for i in issues if i.severity == 2]),
-                'low': len([i for i in issues if i.severity == 1])
+                'high': severities[3],
+                'medium': severities[2],
+                'low': severities[1]
             }
         }
 
@@ -650,21 +987,22 @@ class SmartPatchProcessor:
         """Affiche le résumé final"""
         failed_count = total_groups - success_count
 
-        print(f"{Colors.BOLD}📊 RÉSUMÉ DU TRAITEMENT:{Colors.END}")
-        print(f"   • Total patches: {total_patches}")
-        print(f"   • Fichiers cibles: {total_groups}")
-        print(f"   • {Colors.GREEN}Succès: {success_count}{Colors.END}")
-        print(f"   • {Colors.RED}Échecs: {failed_count}{Colors.END}")
-        print(f"   • {Colors.YELLOW}Problèmes corrigés: {total_issues_fixed}{Colors.END}")
-        print(f"   • ⏱️ Temps de traitement: {processing_time:.2f}s")
+        self._emit(f"{Colors.BOLD}📊 RÉSUMÉ DU TRAITEMENT:{Colors.END}")
+        self._emit(f"   • Total patches: {total_patches}")
+        self._emit(f"   • Fichiers cibles: {total_groups}")
+        self._emit(f"   • {Colors.GREEN}Succès: {success_count}{Colors.END}")
+        self._emit(f"   • {Colors.RED}Échecs: {failed_count}{Colors.END}")
+        self._emit(f"   • {Colors.YELLOW}Problèmes corrigés: {total_issues_fixed}{Colors.END}")
+        self._emit(f"   • ⏱️ Temps de traitement: {processing_time:.2f}s")
 
         if success_count > 0:
-            print(f"   • {Colors.BLUE}Fichiers générés dans: {self.output_dir}{Colors.END}")
+            self._emit(f"   • {Colors.BLUE}Fichiers générés dans: {self.output_dir}{Colors.END}")
 
+        self._flush_output()
 
     def process_wizard_patches(self, selected_patches: List[Path]) -> Dict:
         """Traite spécifiquement les patches sélectionnés par le wizard"""
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
 
         print(f"{Colors.BLUE}📦 Traitement de {len(selected_patches)} patch(es) sélectionné(s)...{Colors.END}\n")
 
@@ -672,8 +1010,11 @@ class SmartPatchProcessor:
         success_count = 0
         total_issues_fixed = 0
 
+        # Lectures groupées avant la boucle de traitement
+        self._prefetch_patch_contents(selected_patches)
+
         for i, patch_path in enumerate(selected_patches, 1):
-            print(f"{Colors.CYAN}[{i}/{len(selected_patches)}] 📄 {patch_path.name}{Colors.END}")
+            self._emit(f"{Colors.CYAN}[{i}/{len(selected_patches)}] 📄 {patch_path.name}{Colors.END}")
 
             try:
                 result = self.process_single_patch(patch_path)
@@ -684,19 +1025,23 @@ class SmartPatchProcessor:
                     issues_count = len(result.issues)
                     total_issues_fixed += issues_count
 
-                    print(f"{Colors.GREEN}   ✅ Succès: {result.output_file}{Colors.END}")
+                    self._emit(f"{Colors.GREEN}   ✅ Succès: {result.output_file}{Colors.END}")
                     if issues_count > 0:
-                        print(f"{Colors.YELLOW}   🔧 {issues_count} problème(s) corrigé(s){Colors.END}")
+                        self._emit(f"{Colors.YELLOW}   🔧 {issues_count} problème(s) corrigé(s){Colors.END}")
                 else:
-                    print(f"{Colors.RED}   ❌ Échec: {', '.join(result.errors)}{Colors.END}")
+                    self._emit(f"{Colors.RED}   ❌ Échec: {', '.join(result.errors)}{Colors.END}")
 
             except Exception as e:
-                print(f"{Colors.RED}   ❌ Erreur: {e}{Colors.END}")
+                self._emit(f"{Colors.RED}   ❌ Erreur: {e}{Colors.END}")
 
-            print()
+            # Une seule écriture par patch
+            self._emit("")
+            self._flush_output()
+
+        self._release_patch_contents()
 
         # Calculer le temps de traitement
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
 
         # Résumé final
         self._print_summary(len(selected_patches), len(selected_patches),
@@ -711,9 +1056,68 @@ class SmartPatchProcessor:
             'processing_time': processing_time
         }
 
+    @staticmethod
+    def _json_default(obj: Any) -> Any:
+        """Sérialisation des objets non natifs (PatchIssue, Path) pour le rapport"""
+        if isinstance(obj, PatchIssue):
+            return obj.to_dict()
+        if isinstance(obj, Path):
+            return str(obj)
+        raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
+
+    def _iter_report_entries(self, results: List[ProcessingResult]) -> Iterator[Dict]:
+        """Génère les entrées détaillées du rapport, une par résultat"""
+        for result in results:
+            target_file, output_file, success, processing_type, errors = _RESULT_COMMON(result)
+            issues = list(map(PatchIssue.to_dict, result.issues))
+
+            if processing_type == 'cumulative':
+                report_entry = {
+                    'target_file': target_file,
+                    'output_file': output_file,
+                    'success': success,
+                    'processing_type': processing_type,
+                    'errors': errors,
+                    'patches_applied': result.patches,
+                    'cumulative_issues': issues
+                }
+            else:
+                report_entry = {
+                    'target_file': target_file,
+                    'output_file': output_file,
+                    'success': success,
+                    'processing_type': processing_type,
+                    'errors': errors,
+                    'patch_file': result.patch_file,
+                    'issues': issues
+                }
+
+            if success and result.stats:
+                report_entry['statistics'] = result.stats
+
+            yield report_entry
+
+    def _write_json_report_streaming(self, report_file: Path, report_data: Dict,
+                                     entries: Iterator[Dict]) -> None:
+        """Écrit le rapport JSON entrée par entrée (même rendu qu'un orjson.dumps indenté)"""
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        head = orjson.dumps(report_data, default=self._json_default, option=option)
+
+        with open(report_file, 'wb', buffering=_REPORT_BUFFER) as f:
+            # Tête sans l'accolade finale, puis la liste ouverte au même niveau d'indentation
+            f.write(head[:-2])
+            f.write(b',\n  "detailed_results": [')
+            separator = b'\n    '
+            for entry in entries:
+                f.write(separator)
+                # Les chaînes JSON n'ont pas de saut de ligne brut: réindentation sûre
+                f.write(orjson.dumps(entry, default=self._json_default,
+                                     option=option).replace(b'\n', b'\n    '))
+                separator = b',\n    '
+            f.write(b'\n  ]\n}' if separator != b'\n    ' else b']\n}')
+
     def generate_report(self, summary: Dict) -> str:
         """Générer un rapport détaillé"""
-        report_format = self.config.get('output', 'report_format', 'json')
 
         report_data = {
             'metadata': {
@@ -730,41 +1134,25 @@ class SmartPatchProcessor:
                 'failed_targets': summary['failed'],
                 'processing_time_seconds': summary.get('processing_time', 0)
             },
-            'statistics': self.processing_stats,
-            'detailed_results': []
+            'statistics': self.processing_stats
         }
+        entries = self._iter_report_entries(summary['results'])
 
-        # Traiter les résultats détaillés
-        for result in summary['results']:
-            report_entry = {
-                'target_file': result.target_file,
-                'output_file': result.output_file,
-                'success': result.success,
-                'processing_type': result.processing_type,
-                'errors': result.errors
-            }
-
-            if result.processing_type == 'cumulative':
-                report_entry['patches_applied'] = result.patches
-                report_entry['cumulative_issues'] = [issue.to_dict() for issue in result.issues]
-            else:
-                report_entry['patch_file'] = result.patch_file
-                report_entry['issues'] = [issue.to_dict() for issue in result.issues]
-
-            if result.success and result.stats:
-                report_entry['statistics'] = result.stats
-
-            report_data['detailed_results'].append(report_entry)
-
-        # Sauvegarder le rapport
-        if report_format.lower() == 'yaml':
+        # Sauvegarder le rapport (tampon de 64 Ko pour limiter les appels write)
+        if self._report_format == 'yaml':
+            report_data['detailed_results'] = list(entries)
             report_file = self.output_dir / 'processing_report.yaml'
-            with open(report_file, 'w', encoding='utf-8') as f:
-                yaml.dump(report_data, f, default_flow_style=False, allow_unicode=True)
+            with open(report_file, 'w', encoding='utf-8', buffering=_REPORT_BUFFER) as f:
+                yaml.dump(report_data, f, Dumper=SafeDumper, default_flow_style=False, allow_unicode=True)
         else:
             report_file = self.output_dir / 'processing_report.json'
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                # Les entrées détaillées ne sont jamais toutes en mémoire
+                self._write_json_report_streaming(report_file, report_data, entries)
+            else:
+                report_data['detailed_results'] = list(entries)
+                with open(report_file, 'w', encoding='utf-8', buffering=_REPORT_BUFFER) as f:
+                    json.dump(report_data, f, indent=2, ensure_ascii=False, default=self._json_default)
 
         self.logger.info(f"Rapport généré: {report_file}")
         return str(report_file)
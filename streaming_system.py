@@ -5,18 +5,26 @@ Regroupe: StreamingConfig, StreamingStats, CircularBuffer, StreamingFileReader,
 """
 
 import logging
+import os
+import sys
 import threading
 import mmap
 import time
-import weakref
 from pathlib import Path
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
 
 # ============================================================================
 # CONFIGURATION ET STATS
 # ============================================================================
 
+# Au-delà de 100 Mo, des lectures de 8 Ko sont limitées par les appels système
+_LARGE_READ_THRESHOLD = 100 * 1024 * 1024
+_LARGE_READ_CHUNK = 1 << 17
+
+# __slots__ générés par dataclass (Python 3.10+): compteurs sans __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 @dataclass
 class StreamingConfig:
     """Configuration pour le streaming de fichiers"""
@@ -30,8 +38,9 @@ class StreamingConfig:
     use_mmap: bool = True
     default_encoding: str = 'utf-8'
     encoding_errors: str = 'replace'
+    thread_safe_stats: bool = False
 
-@dataclass
+@dataclass(**_SLOTS)
 class StreamingStats:
     """Statistiques de performance du streaming"""
     files_processed: int = 0
@@ -40,73 +49,110 @@ class StreamingStats:
     mmap_files: int = 0
     memory_saved_mb: float = 0.0
     avg_processing_time_ms: float = 0.0
+    registered_mappings: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Instantané des compteurs, construit uniquement à la demande"""
+        return {
+            'files_processed': self.files_processed,
+            'bytes_processed': self.bytes_processed,
+            'streaming_files': self.streaming_files,
+            'mmap_files': self.mmap_files,
+            'memory_saved_mb': self.memory_saved_mb,
+            'avg_processing_time_ms': self.avg_processing_time_ms,
+            'registered_mappings': self.registered_mappings
+        }
 
 # ============================================================================
 # BUFFER CIRCULAIRE
 # ============================================================================
 
-class CircularBuffer:
-    """Buffer circulaire optimisé pour le streaming"""
+class CircularBufferSPSC:
+    """Buffer circulaire sans verrou, pour un seul producteur et un seul consommateur
+
+    Compteurs monotones: seul write() modifie _written, seul read() modifie
+    _read; plein et vide se déduisent de leur différence, sans drapeau partagé.
+    """
     
     def __init__(self, size: int):
         self.size = size
         self.buffer = bytearray(size)
-        self.start = 0
-        self.end = 0
-        self.is_full = False
+        self._view = memoryview(self.buffer)
+        self._written = 0
+        self._read = 0
+    
+    @property
+    def start(self) -> int:
+        return self._read % self.size
+    
+    @property
+    def end(self) -> int:
+        return self._written % self.size
+    
+    @property
+    def is_full(self) -> bool:
+        return self._written - self._read == self.size
+    
+    def write(self, data: bytes) -> int:
+        if not data:
+            return 0
+        
+        written = self._written
+        data_len = min(len(data), self.size - (written - self._read))
+        if data_len <= 0:
+            return 0
+        
+        # Deux copies systématiques, la seconde vide si l'écriture ne boucle pas
+        end = written % self.size
+        first = min(data_len, self.size - end)
+        src = memoryview(data)
+        self._view[end:end + first] = src[:first]
+        self._view[:data_len - first] = src[first:data_len]
+        # Publié après la copie: le consommateur ne voit que des données écrites
+        self._written = written + data_len
+        return data_len
+    
+    def read(self, size: int) -> bytes:
+        read = self._read
+        to_read = min(size, self._written - read)
+        if to_read <= 0:
+            return b''
+        
+        start = read % self.size
+        first = min(to_read, self.size - start)
+        result = b''.join((self._view[start:start + first], self._view[:to_read - first]))
+        self._read = read + to_read
+        return result
+    
+    def available_data(self) -> int:
+        return self._written - self._read
+    
+    def clear(self):
+        # À n'appeler qu'en l'absence d'écriture ou de lecture concurrente
+        self._written = 0
+        self._read = 0
+
+class CircularBufferMT(CircularBufferSPSC):
+    """Buffer circulaire partageable entre threads (opérations sous verrou)"""
+    
+    def __init__(self, size: int):
+        super().__init__(size)
         self._lock = threading.Lock()
     
     def write(self, data: bytes) -> int:
         with self._lock:
-            if not data or self.is_full:
-                return 0
-            
-            data_len = min(len(data), self.size - self.available_data())
-            if data_len == 0:
-                return 0
-            
-            if self.end + data_len <= self.size:
-                self.buffer[self.end:self.end + data_len] = data[:data_len]
-                self.end = (self.end + data_len) % self.size
-            else:
-                first_part = self.size - self.end
-                self.buffer[self.end:] = data[:first_part]
-                self.buffer[:data_len - first_part] = data[first_part:data_len]
-                self.end = data_len - first_part
-            
-            if self.end == self.start:
-                self.is_full = True
-            return data_len
+            return super().write(data)
     
     def read(self, size: int) -> bytes:
         with self._lock:
-            if self.start == self.end and not self.is_full:
-                return b''
-            
-            available = self.size if self.is_full else (self.end - self.start) % self.size
-            to_read = min(size, available)
-            
-            if self.start + to_read <= self.size:
-                result = bytes(self.buffer[self.start:self.start + to_read])
-                self.start = (self.start + to_read) % self.size
-            else:
-                first_part = self.size - self.start
-                result = bytes(self.buffer[self.start:] + self.buffer[:to_read - first_part])
-                self.start = to_read - first_part
-            
-            self.is_full = False
-            return result
-    
-    def available_data(self) -> int:
-        if self.is_full:
-            return self.size
-        return (self.end - self.start) % self.size
+            return super().read(size)
     
     def clear(self):
         with self._lock:
-            self.start = 0
-            self.end = 0
-            self.is_full = False
+            super().clear()
+
+# Nom historique: version protégée par verrou
+CircularBuffer = CircularBufferMT
 
 # ============================================================================
 # LECTEUR DE FICHIER STREAMING
@@ -120,47 +166,103 @@ class StreamingFileReader:
         self.config = config
         self._file_handle = None
         self._mmap = None
+        self._mv = None
+        self._chunk = None
         self._size = file_path.stat().st_size if file_path.exists() else 0
         self._use_mmap = (self._size > config.huge_file_threshold_mb * 1024 * 1024 
                          and config.use_mmap)
-        self._buffer = CircularBuffer(config.large_chunk_size)
     
-    def read_chunks(self, chunk_size: int = None):
-        """Génère les chunks du fichier"""
-        chunk_size = chunk_size or self.config.default_chunk_size
+    def read_chunks(self, chunk_size: int = None, zero_copy: bool = False):
+        """Génère les chunks du fichier (bytes)
+
+        zero_copy=True: en mode mmap, chunks en memoryview sans copie, valides
+        seulement jusqu'à la demande du chunk suivant.
+        """
+        if not chunk_size:
+            chunk_size = self.config.default_chunk_size
+            if self._size > _LARGE_READ_THRESHOLD:
+                chunk_size = max(chunk_size, _LARGE_READ_CHUNK)
         
         if self._use_mmap:
-            yield from self._read_chunks_mmap(chunk_size)
+            yield from self._read_chunks_mmap(chunk_size, zero_copy)
         else:
             yield from self._read_chunks_standard(chunk_size)
     
-    def _read_chunks_mmap(self, chunk_size: int):
-        """Lecture via mmap pour très gros fichiers"""
+    @property
+    def registered(self) -> bool:
+        """Indique si le fichier est actuellement mappé en mémoire"""
+        return self._mv is not None
+    
+    def _ensure_mapped(self):
+        """Mappe le fichier une seule fois pour toute la durée de vie du lecteur"""
+        if self._mv is not None:
+            return
+        
+        f = open(self.file_path, 'rb')
         try:
-            with open(self.file_path, 'rb') as f:
-                self._file_handle = f
-                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                    self._mmap = mm
-                    position = 0
-                    
-                    while position < len(mm):
-                        chunk = mm[position:position + chunk_size]
-                        position += len(chunk)
-                        yield chunk
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        
+        self._file_handle = f
+        self._mmap = mm
+        self._mv = memoryview(mm)
+    
+    def _read_chunks_mmap(self, chunk_size: int, zero_copy: bool = False):
+        """Lecture via mmap pour très gros fichiers
+
+        Par défaut chaque chunk est copié en bytes et reste utilisable. En
+        zero_copy, ce sont des memoryview sur le mapping, libérées à la
+        demande du chunk suivant. Le mapping est réutilisé par les parcours
+        suivants jusqu'à close().
+        """
+        self._ensure_mapped()
+        if not zero_copy:
+            mm = self._mmap
+            for position in range(0, len(mm), chunk_size):
+                yield mm[position:position + chunk_size]
+            return
+
+        try:
+            for position in range(0, len(self._mv), chunk_size):
+                self._chunk = self._mv[position:position + chunk_size]
+                yield self._chunk
+                self._chunk.release()
         finally:
-            self._mmap = None
-            self._file_handle = None
+            if self._chunk is not None:
+                self._chunk.release()
+                self._chunk = None
+    
+    def _release_views(self):
+        if self._chunk is not None:
+            self._chunk.release()
+            self._chunk = None
+        if self._mv is not None:
+            self._mv.release()
+            self._mv = None
     
     def _read_chunks_standard(self, chunk_size: int):
         """Lecture standard avec buffer"""
+        # Fichiers de streaming: lecture anticipée agressive, pages libérées ensuite
+        advise = (hasattr(os, 'posix_fadvise') and
+                  self._size > self.config.large_file_threshold_mb * 1024 * 1024)
         try:
             with open(self.file_path, 'rb') as f:
                 self._file_handle = f
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    yield chunk
+                if advise:
+                    os.posix_fadvise(f.fileno(), 0, self._size, os.POSIX_FADV_SEQUENTIAL)
+                try:
+                    while True:
+                        chunk = f.read(chunk_size)
+                        if not chunk:
+                            break
+                        yield chunk
+                finally:
+                    if advise:
+                        os.posix_fadvise(f.fileno(), 0, self._size, os.POSIX_FADV_DONTNEED)
         finally:
             self._file_handle = None
     
@@ -168,10 +270,21 @@ class StreamingFileReader:
         return self._size
     
     def close(self):
+        # Le mapping ne peut être fermé tant que des vues existent
+        self._release_views()
         if self._mmap:
             self._mmap.close()
+            self._mmap = None
         if self._file_handle:
             self._file_handle.close()
+            self._file_handle = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
 
 # ============================================================================
 # GESTIONNAIRE DE STREAMING
@@ -180,11 +293,15 @@ class StreamingFileReader:
 class StreamingManager:
     """Gestionnaire du streaming de fichiers"""
     
+    EWMA_ALPHA = 0.1
+    
     def __init__(self, config: Optional[StreamingConfig] = None):
         self.config = config or StreamingConfig()
         self.stats = StreamingStats()
+        # Verrou uniquement si le gestionnaire est partagé entre threads
+        self._stats_lock = threading.Lock() if self.config.thread_safe_stats else nullcontext()
         self.logger = logging.getLogger('smart_patch_processor.streaming')
-        self._active_readers = weakref.WeakSet()
+        self._active_count = 0
     
     def should_use_streaming(self, file_path: Path) -> bool:
         """Détermine si un fichier doit utiliser le streaming"""
@@ -197,42 +314,41 @@ class StreamingManager:
     def create_reader(self, file_path: Path) -> StreamingFileReader:
         """Crée un lecteur streaming pour un fichier"""
         reader = StreamingFileReader(file_path, self.config)
-        self._active_readers.add(reader)
-        
+
         if self.should_use_streaming(file_path):
-            self.stats.streaming_files += 1
-            if reader._use_mmap:
-                self.stats.mmap_files += 1
+            with self._stats_lock:
+                self.stats.streaming_files += 1
+                if reader._use_mmap:
+                    self.stats.mmap_files += 1
         
         return reader
     
     @contextmanager
     def streaming_context(self, file_path: Path):
         """Context manager pour gérer automatiquement un lecteur"""
-        reader = None
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
-        try:
-            reader = self.create_reader(file_path)
-            yield reader
-        finally:
-            if reader:
-                processing_time = time.time() - start_time
-                self.stats.files_processed += 1
-                self.stats.bytes_processed += reader.get_file_size()
-                self.stats.avg_processing_time_ms = (
-                    (self.stats.avg_processing_time_ms * 0.9) +
-                    (processing_time * 1000 * 0.1)
-                )
-                reader.close()
+        with self.create_reader(file_path) as reader:
+            with self._stats_lock:
+                self._active_count += 1
+            try:
+                yield reader
+            finally:
+                processing_time_ms = (time.monotonic_ns() - start_ns) / 1e6
+                alpha = self.EWMA_ALPHA
+                stats = self.stats
+                with self._stats_lock:
+                    self._active_count -= 1
+                    stats.files_processed += 1
+                    stats.bytes_processed += reader._size
+                    if reader.registered:
+                        stats.registered_mappings += 1
+                    stats.avg_processing_time_ms = (
+                        stats.avg_processing_time_ms * (1 - alpha) + processing_time_ms * alpha)
     
     def get_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques du streaming"""
-        return {
-            'files_processed': self.stats.files_processed,
-            'bytes_processed': self.stats.bytes_processed,
-            'streaming_files': self.stats.streaming_files,
-            'mmap_files': self.stats.mmap_files,
-            'memory_saved_mb': self.stats.memory_saved_mb,
-            'avg_processing_time_ms': self.stats.avg_processing_time_ms
-        }
+        with self._stats_lock:
+            stats = self.stats.to_dict()
+            stats['active_readers'] = self._active_count
+        return stats
@@ -6,12 +6,50 @@ Problème: Détection incorrecte des fichiers cibles causant la création de "er
 import os
 import re
 import glob
+import hashlib
 import logging
 from pathlib import Path
-from typing import Optional, List
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterator, Optional, List, Tuple
 
 from patch_processor_config import PatchProcessorConfig
 
+# Métadonnées (horodatages) à retirer des noms de fichiers des en-têtes
+_TIMESTAMP_RE = re.compile(r'\s+\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}.*$')
+_DATE_RE = re.compile(r'\s+[A-Z][a-z]{2}\s+[A-Z][a-z]{2}\s+\d+.*$')  # Mon Jan 01...
+_VALID_FILENAME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9_.-]*\.[a-zA-Z0-9]+$')
+
+# Indices de l'heuristique (classes, fonctions, imports Python), première
+# occurrence sur chaque ligne ajoutée ou supprimée
+_CLASS_RE = re.compile(r'^[+-][^\n]*?class[^\S\n]+([A-Z][a-zA-Z0-9_]+)', re.MULTILINE)
+_FUNC_RE = re.compile(r'^[+-][^\n]*?def[^\S\n]+([a-zA-Z_][a-zA-Z0-9_]+)', re.MULTILINE)
+_IMPORT_RE = re.compile(r'^[+-][^\n]*?from[^\S\n]+([a-zA-Z_][a-zA-Z0-9_.]+)[^\S\n]+import', re.MULTILINE)
+_HEURISTIC_WINDOW_LINES = 100
+
+# Répertoires sans sources utilisateur (VCS, environnements, caches, artefacts de build),
+# jamais parcourus lors des recherches de fichiers cibles
+PRUNED_DIRECTORIES = frozenset({
+    '.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv', '.tox',
+    'build', 'dist', '.mypy_cache', '.pytest_cache',
+})
+# Noms trop génériques pour désigner un fichier (méthodes spéciales, points d'entrée)
+_HEURISTIC_STOPWORDS = frozenset({
+    '__init__', '__main__', '__str__', '__repr__', '__call__', '__enter__', '__exit__',
+    'main', 'self', 'test', 'setup', 'teardown', 'typing', 'dataclasses', 'collections',
+})
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Équivalent paresseux de text.split('\\n'): l'en-tête seul est parcouru"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
 class TargetFileDetector:
     """Responsable de la détection intelligente des fichiers cibles - VERSION CORRIGÉE"""
 
@@ -31,26 +69,35 @@ class TargetFileDetector:
             r'^\+\+\+\s+([^\t\r\n]+)',       # Context diff nouveau
         ])
 
+        # Motifs compilés une fois; git diff: le fichier nouveau est le groupe 2
+        self._compiled_patterns = []
+        for pattern in self.search_patterns:
+            try:
+                self._compiled_patterns.append((re.compile(pattern), pattern.startswith(r'^diff\s+--git')))
+            except re.error as e:
+                self.logger.warning(f"Motif de détection invalide ignoré '{pattern}': {e}")
+
         self.file_extensions = detection_config.get('file_extensions', [])
         self.max_search_depth = detection_config.get('max_search_depth', 3)
 
+        # Cibles déjà détectées, indexées par signature de l'en-tête du patch
+        self._header_targets_cache: Dict[bytes, Optional[Path]] = {}
+
+        # Index des fichiers par racine de recherche: nom -> (chemin le moins profond, profondeur)
+        self._fs_index: Dict[Path, Dict[str, Tuple[str, int]]] = {}
+        self._search_dirs: Dict[Path, List[Path]] = {}
+        self._keyword_cache: Dict[Tuple[Path, str], Optional[Path]] = {}
+        self._source_listing: Dict[Path, List[Tuple[str, str]]] = {}
+        # Résolutions par nom de fichier: trouvées et absentes (évite de reparcourir les index)
+        self._found_cache: Dict[Tuple[Path, str], Path] = {}
+        self._miss_set: set = set()
+
     def detect_target_file(self, patch_path: Path, patch_content: str) -> Optional[Path]:
         """Détecter intelligemment le fichier cible d'un patch - VERSION CORRIGÉE"""
         self.logger.debug(f"Détection du fichier cible pour {patch_path}")
 
-        # CORRECTION 1: D'abord essayer de détecter PLUSIEURS fichiers depuis le contenu
-        targets = self._detect_all_targets_from_patch_content(patch_content)
-        if targets:
-            # Prendre le premier fichier valide trouvé
-            for target in targets:
-                if target and target.exists():
-                    self.logger.info(f"Fichier cible détecté depuis le contenu: {target}")
-                    return target
-
-        # CORRECTION 2: Essayer avec le nom du patch (sans erreurs de parsing)
-        target = self._detect_from_patch_name_safe(patch_path)
+        target = self.detect_target_from_headers(patch_path, patch_content)
         if target:
-            self.logger.info(f"Fichier cible détecté depuis le nom: {target}")
             return target
 
         # CORRECTION 3: Recherche heuristique améliorée
@@ -62,10 +109,66 @@ class TargetFileDetector:
         self.logger.warning(f"Aucun fichier cible détecté pour {patch_path}")
         return None
 
+    def detect_target_from_headers(self, patch_path: Path, patch_content: str) -> Optional[Path]:
+        """Détection sans heuristique: seuls l'en-tête du patch et son nom sont utilisés"""
+        # CORRECTION 1: D'abord essayer de détecter le fichier depuis le contenu
+        target = self._detect_first_target_cached(patch_content)
+        if target:
+            self.logger.info(f"Fichier cible détecté depuis le contenu: {target}")
+            return target
+
+        # CORRECTION 2: Essayer avec le nom du patch (sans erreurs de parsing)
+        target = self._detect_from_patch_name_safe(patch_path)
+        if target:
+            self.logger.info(f"Fichier cible détecté depuis le nom: {target}")
+            return target
+
+        return None
+
+    def _detect_first_target_cached(self, patch_content: str, window: int = 2048) -> Optional[Path]:
+        """Détection depuis le contenu, mémorisée par signature blake2b de l'en-tête"""
+        truncated = len(patch_content) > window
+        lines = patch_content[:window].split('\n')
+        if truncated:
+            lines = lines[:-1]  # Dernière ligne possiblement coupée
+
+        # Seul l'en-tête (avant la première ligne de contenu) sert à la détection
+        header_lines = None
+        for index, line in enumerate(lines):
+            if line.startswith(('@@', ' ', '+', '-')) and not line.startswith(('+++', '---')):
+                header_lines = lines[:index]
+                break
+        if header_lines is None:
+            if truncated:
+                # En-tête plus long que la fenêtre: pas de signature fiable
+                return self._first_existing_target(patch_content)
+            header_lines = lines
+
+        header = '\n'.join(header_lines)
+        signature = hashlib.blake2b(header.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        if signature in self._header_targets_cache:
+            target = self._header_targets_cache[signature]
+            if target is None or target.exists():
+                return target
+        target = self._first_existing_target(patch_content)
+        self._header_targets_cache[signature] = target
+        return target
+
+    def _first_existing_target(self, patch_content: str) -> Optional[Path]:
+        """Premier candidat existant: les lignes suivantes de l'en-tête ne sont pas analysées"""
+        for target in self._iter_targets_from_patch_content(patch_content):
+            if target.exists():
+                return target
+        return None
+
     def _detect_all_targets_from_patch_content(self, patch_content: str) -> List[Path]:
         """NOUVEAU: Détecte TOUS les fichiers cibles possibles dans le patch"""
-        targets = []
-        lines = patch_content.split('\n')
+        return list(self._iter_targets_from_patch_content(patch_content))
+
+    def _iter_targets_from_patch_content(self, patch_content: str) -> Iterator[Path]:
+        """Génère les fichiers cibles candidats au fil des lignes d'en-tête"""
+        seen = set()
+        lines = _iter_lines(patch_content)
 
         # CORRECTION: Analyser TOUTES les lignes d'en-tête, pas seulement les 10 premières
         for line_num, line in enumerate(lines):
@@ -77,12 +180,12 @@ class TargetFileDetector:
             if not line:
                 continue
 
-            for pattern in self.search_patterns:
+            for pattern, is_git_diff in self._compiled_patterns:
                 try:
-                    match = re.search(pattern, line)
+                    match = pattern.search(line)
                     if match:
                         # CORRECTION: Gestion des différents groupes de capture
-                        if pattern.startswith(r'^diff\s+--git'):
+                        if is_git_diff:
                             # Pour git diff, prendre le fichier nouveau (groupe 2)
                             filename = match.group(2).strip()
                         else:
@@ -91,16 +194,15 @@ class TargetFileDetector:
 
                         # CORRECTION: Validation et nettoyage du nom de fichier
                         target = self._resolve_filename_safe(filename)
-                        if target and target not in targets:
-                            targets.append(target)
+                        if target and target not in seen:
+                            seen.add(target)
                             self.logger.debug(f"Fichier candidat trouvé: {target} (ligne {line_num + 1})")
+                            yield target
 
                 except Exception as e:
                     self.logger.debug(f"Erreur parsing ligne '{line}': {e}")
                     continue
 
-        return targets
-
     def _resolve_filename_safe(self, filename: str) -> Optional[Path]:
         """CORRECTION: Résolution sécurisée et robuste des noms de fichiers"""
         if not filename or not isinstance(filename, str):
@@ -109,10 +211,14 @@ class TargetFileDetector:
         # CORRECTION: Nettoyer les caractères parasites et timestamps
         filename = filename.strip()
 
+        # Sentinelle "pas de fichier" des diffs (création/suppression), horodatage éventuel compris
+        if filename.startswith('/dev/null'):
+            return None
+
         # Supprimer les timestamps et métadonnées communes
         # Exemple: "execution_screen.py	2024-01-01 12:00:01.000000000 +0100"
-        filename = re.sub(r'\s+\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}.*$', '', filename)
-        filename = re.sub(r'\s+[A-Z][a-z]{2}\s+[A-Z][a-z]{2}\s+\d+.*$', '', filename)  # Mon Jan 01...
+        filename = _TIMESTAMP_RE.sub('', filename)
+        filename = _DATE_RE.sub('', filename)
         filename = filename.split('\t')[0]  # Supprimer tout après une tabulation
         filename = filename.strip()
 
@@ -127,7 +233,7 @@ class TargetFileDetector:
             return None
 
         # CORRECTION: Vérifier si c'est un nom de fichier valide
-        if not re.match(r'^[a-zA-Z][a-zA-Z0-9_.-]*\.[a-zA-Z0-9]+$', clean_name):
+        if not _VALID_FILENAME_RE.match(clean_name):
             self.logger.debug(f"Nom de fichier invalide ignoré: '{clean_name}'")
             return None
 
@@ -135,54 +241,109 @@ class TargetFileDetector:
 
     def _find_target_file_improved(self, base_name: str) -> Optional[Path]:
         """CORRECTION: Recherche améliorée des fichiers cibles"""
-        # CORRECTION: Étendre la recherche à plus de répertoires
-        search_dirs = [
-            Path.cwd(),                    # Répertoire courant
-            self.base_dir,                 # Répertoire de base
-            self.base_dir.parent,          # Répertoire parent
-            Path.cwd().parent,             # Parent du répertoire courant
-        ]
+        key = (Path.cwd(), base_name)
+        found = self._found_cache.get(key)
+        if found is not None:
+            if found.is_file():
+                return found
+            # Fichier disparu depuis l'indexation: index périmés
+            self.clear_detection_caches()
+        if key in self._miss_set:
+            return None
 
-        # Ajouter des sous-répertoires communs
-        for base_dir in [Path.cwd(), self.base_dir]:
-            for subdir in ['src', 'source', 'lib', 'app', 'ui', 'core']:
-                subdir_path = base_dir / subdir
-                if subdir_path.exists():
-                    search_dirs.append(subdir_path)
+        found = self._lookup_target_file(base_name)
+        if found is None:
+            self._miss_set.add(key)
+        else:
+            self._found_cache[key] = found
+        return found
 
-        # Supprimer les doublons tout en gardant l'ordre
-        seen = set()
-        unique_dirs = []
-        for d in search_dirs:
-            if d.exists() and d not in seen:
-                seen.add(d)
-                unique_dirs.append(d)
-
-        for search_dir in unique_dirs:
+    def _lookup_target_file(self, base_name: str) -> Optional[Path]:
+        """Recherche dans les index des répertoires de recherche, dans l'ordre"""
+        for search_dir in self._get_search_dirs():
             self.logger.debug(f"Recherche dans: {search_dir}")
 
-            # CORRECTION 1: Essayer le nom exact d'abord
-            exact_match = search_dir / base_name
-            if exact_match.exists() and exact_match.is_file():
-                self.logger.debug(f"Fichier trouvé (exact): {exact_match}")
-                return exact_match
+            hit = self._dir_index(search_dir).get(base_name)
+            if hit is None:
+                continue
 
-            # CORRECTION 2: Recherche récursive limitée avec patterns
-            for depth in range(1, min(self.max_search_depth + 1, 4)):
-                pattern = "*/" * depth + base_name
-                try:
-                    for file_path in search_dir.glob(pattern):
-                        if (file_path.is_file() and
-                            not file_path.name.endswith(('.patch', '.diff', '.orig', '.backup'))):
-                            self.logger.debug(f"Fichier trouvé (récursif): {file_path}")
-                            return file_path
-                except Exception as e:
-                    self.logger.debug(f"Erreur recherche récursive: {e}")
-                    continue
+            path, depth = hit
+            # CORRECTION 1: Le nom exact d'abord
+            if depth == 0:
+                self.logger.debug(f"Fichier trouvé (exact): {path}")
+                return Path(path)
+
+            # CORRECTION 2: Recherche récursive limitée
+            if not base_name.endswith(('.patch', '.diff', '.orig', '.backup')):
+                self.logger.debug(f"Fichier trouvé (récursif): {path}")
+                return Path(path)
 
         self.logger.debug(f"Fichier non trouvé: {base_name}")
         return None
 
+    def _get_search_dirs(self) -> List[Path]:
+        """Répertoires de recherche existants, sans doublons, calculés une fois par cwd"""
+        cwd = Path.cwd()
+        unique_dirs = self._search_dirs.get(cwd)
+        if unique_dirs is not None:
+            return unique_dirs
+
+        # CORRECTION: Étendre la recherche à plus de répertoires
+        search_dirs = [
+            cwd,                           # Répertoire courant
+            self.base_dir,                 # Répertoire de base
+            self.base_dir.parent,          # Répertoire parent
+            cwd.parent,                    # Parent du répertoire courant
+        ]
+
+        # Ajouter des sous-répertoires communs
+        for base_dir in [cwd, self.base_dir]:
+            for subdir in ['src', 'source', 'lib', 'app', 'ui', 'core']:
+                search_dirs.append(base_dir / subdir)
+
+        # Supprimer les doublons tout en gardant l'ordre (un seul stat par répertoire)
+        unique_dirs = [d for d in dict.fromkeys(search_dirs) if d.is_dir()]
+
+        self._search_dirs[cwd] = unique_dirs
+        return unique_dirs
+
+    def _dir_index(self, root: Path) -> Dict[str, Tuple[str, int]]:
+        """Indexe les fichiers de root (niveaux 0 à max_search_depth) en un seul parcours"""
+        index = self._fs_index.get(root)
+        if index is not None:
+            return index
+
+        index = {}
+        max_depth = min(self.max_search_depth, 3)
+        # Parcours en largeur: le fichier le moins profond est retenu
+        pending = deque([(str(root), 0)])
+        while pending:
+            directory, depth = pending.popleft()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            if entry.name not in index:
+                                index[entry.name] = (entry.path, depth)
+                        elif (depth < max_depth and entry.name not in PRUNED_DIRECTORIES
+                              and entry.is_dir()):
+                            pending.append((entry.path, depth + 1))
+            except OSError as e:
+                self.logger.debug(f"Erreur recherche récursive: {e}")
+
+        self._fs_index[root] = index
+        return index
+
+    def clear_detection_caches(self) -> None:
+        """Oublie les index et résolutions mémorisés (fichiers créés ou supprimés depuis)"""
+        self._fs_index.clear()
+        self._search_dirs.clear()
+        self._found_cache.clear()
+        self._miss_set.clear()
+        self._keyword_cache.clear()
+        self._source_listing.clear()
+        self._header_targets_cache.clear()
+
     def _detect_from_patch_name_safe(self, patch_path: Path) -> Optional[Path]:
         """CORRECTION: Détection sécurisée depuis le nom du patch"""
         try:
@@ -212,75 +373,106 @@ class TargetFileDetector:
 
     def _heuristic_search_improved(self, patch_content: str) -> Optional[Path]:
         """CORRECTION: Recherche heuristique améliorée"""
-        lines = patch_content.split('\n')
-        keywords = set()
-
-        # CORRECTION: Analyser le contenu pour trouver des indices
-        for line in lines[:100]:  # Analyser plus de lignes
-            if line.startswith(('+', '-')) and len(line) > 1:
-                content = line[1:].strip()
-
-                # CORRECTION: Recherche de patterns spécifiques améliorés
-                # Classes Python
-                class_match = re.search(r'class\s+([A-Z][a-zA-Z0-9_]+)', content)
-                if class_match:
-                    class_name = class_match.group(1)
-                    keywords.add(class_name.lower())
-
-                # Fonctions Python
-                func_match = re.search(r'def\s+([a-zA-Z_][a-zA-Z0-9_]+)', content)
-                if func_match:
-                    func_name = func_match.group(1)
-                    keywords.add(func_name)
-
-                # Imports Python
-                import_match = re.search(r'from\s+([a-zA-Z_][a-zA-Z0-9_.]+)\s+import', content)
-                if import_match:
-                    module_name = import_match.group(1)
-                    keywords.add(module_name.replace('.', '_'))
+        # CORRECTION: Analyser le contenu pour trouver des indices (100 premières lignes)
+        window_end = -1
+        for _ in range(_HEURISTIC_WINDOW_LINES):
+            window_end = patch_content.find('\n', window_end + 1)
+            if window_end == -1:
+                window_end = len(patch_content)
+                break
+
+        # Classes Python, fonctions Python, imports Python
+        keywords = {m.group(1).lower() for m in _CLASS_RE.finditer(patch_content, 0, window_end)}
+        keywords.update(m.group(1) for m in _FUNC_RE.finditer(patch_content, 0, window_end))
+        keywords.update(m.group(1).replace('.', '_')
+                        for m in _IMPORT_RE.finditer(patch_content, 0, window_end))
+
+        # Mots trop courts ou trop génériques écartés avant toute recherche;
+        # les plus longs (plus sélectifs) d'abord, ordre déterministe
+        candidates = sorted(
+            (k for k in keywords if len(k) > 3 and k not in _HEURISTIC_STOPWORDS),
+            key=lambda k: (-len(k), k))
 
         # CORRECTION: Rechercher des fichiers basés sur ces mots-clés
-        for keyword in keywords:
-            if len(keyword) > 3:  # Ignorer les mots trop courts
-                # Essayer avec extension Python
-                target = self._find_target_file_improved(f"{keyword}.py")
-                if target:
-                    return target
-
-                # Essayer le mot-clé dans le nom de fichier
-                target = self._find_file_by_keyword(keyword)
-                if target:
-                    return target
+        for keyword in candidates:
+            # Essayer avec extension Python
+            target = self._find_target_file_improved(f"{keyword}.py")
+            if target:
+                return target
+
+            # Essayer le mot-clé dans le nom de fichier
+            target = self._find_file_by_keyword(keyword)
+            if target:
+                return target
 
         return None
 
     def _find_file_by_keyword(self, keyword: str) -> Optional[Path]:
-        """CORRECTION: Trouve un fichier contenant un mot-clé"""
-        search_dirs = [Path.cwd(), self.base_dir]
+        """CORRECTION: Trouve un fichier contenant un mot-clé (mémorisé par mot-clé)"""
+        cwd = Path.cwd()
+        key = (cwd, keyword)
+        if key in self._keyword_cache:
+            cached = self._keyword_cache[key]
+            if cached is None or cached.is_file():
+                return cached
+            self.clear_detection_caches()
+
+        found = self._search_file_by_keyword(keyword, [cwd, self.base_dir])
+        self._keyword_cache[key] = found
+        return found
+
+    def _search_file_by_keyword(self, keyword: str, search_dirs: List[Path]) -> Optional[Path]:
+        """Cherche un fichier *mot-clé*ext dans la liste des fichiers de chaque répertoire"""
+        extensions = self.file_extensions
 
         for search_dir in search_dirs:
-            if not search_dir.exists():
-                continue
-
-            # CORRECTION: Recherche par nom de fichier contenant le mot-clé
-            for ext in self.file_extensions:
-                pattern = f"*{keyword}*{ext}"
-                try:
-                    for file_path in search_dir.glob(pattern):
-                        if file_path.is_file():
-                            return file_path
+            # CORRECTION: Recherche par nom de fichier contenant le mot-clé ("*mot-clé*ext"),
+            # toutes les extensions en une passe (l'ordre des extensions prime)
+            best_rank = len(extensions)
+            best = None
+            for name, path in self._source_files(search_dir):
+                for rank in range(best_rank):
+                    ext = extensions[rank]
+                    if name.endswith(ext) and keyword in name[:len(name) - len(ext)]:
+                        best_rank, best = rank, path
+                        break
+                if not best_rank:
+                    break
+
+            if best is not None:
+                return Path(best)
 
-                    # Recherche récursive limitée
-                    for file_path in search_dir.glob(f"**/{pattern}"):
-                        if (file_path.is_file() and
-                            len(file_path.relative_to(search_dir).parts) <= 3):
-                            return file_path
+        return None
 
-                except Exception as e:
-                    self.logger.debug(f"Erreur recherche mot-clé: {e}")
-                    continue
+    def _source_files(self, root: Path) -> List[Tuple[str, str]]:
+        """Fichiers aux extensions suivies sous root (3 niveaux), listés une fois par détecteur"""
+        listing = self._source_listing.get(root)
+        if listing is not None:
+            return listing
+
+        listing = []
+        suffixes = tuple(self.file_extensions)
+        # Parcours en profondeur préfixe (ordre de "**/"), sans suivre les liens symboliques;
+        # un répertoire absent fait simplement échouer le scandir
+        pending = [(str(root), 0)]
+        while pending:
+            directory, depth = pending.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(suffixes) and entry.is_file():
+                            listing.append((entry.name, entry.path))
+                        if (depth < 2 and entry.name not in PRUNED_DIRECTORIES
+                                and entry.is_dir(follow_symlinks=False)):
+                            subdirs.append(entry.path)
+            except OSError as e:
+                self.logger.debug(f"Erreur recherche mot-clé: {e}")
+                continue
+            pending.extend((subdir, depth + 1) for subdir in reversed(subdirs))
 
-        return None
+        self._source_listing[root] = listing
+        return listing
 
     def get_detection_summary(self) -> dict:
         """NOUVEAU: Résumé des capacités de détection pour debug"""
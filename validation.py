@@ -2,16 +2,125 @@ from typing import List, Optional, Union
 """
 Module de validation d'entrée pour Smart Patch Processor
 Centralise toutes les validations pour éviter les erreurs
+
+Ce module est entièrement typé pour pouvoir être compilé avec mypyc
+(voir comprehensive_fixer.py), sous le nom distinct _validation_c. Le module
+natif n'est utilisé que s'il a été construit à partir de ce fichier exact
+(empreinte SHA-256) : après toute modification, le code Python ci-dessous
+s'applique jusqu'à ce que le correcteur soit relancé.
 """
 
+import functools
+import hashlib
 import os
+import re
+import unicodedata
 from pathlib import Path
 
 
+# Noms réservés (Windows et Unix)
+_RESERVED_WINDOWS = frozenset(['CON', 'PRN', 'AUX', 'NUL'] +
+                              [f'COM{i}' for i in range(1, 10)] +
+                              [f'LPT{i}' for i in range(1, 10)])
+_RESERVED_UNIX = frozenset(['.', '..', ''])
+
+# Préfixes caractéristiques d'une ligne de diff ('+' et '-' seuls: voir _is_diff_line)
+_VALID_PREFIXES = ('@@', '---', '+++', ' ')
+_MAX_DIFF_LINES = 1000  # Lignes examinées au plus, pour éviter les DoS
+_MAX_DIFF_LINE_LENGTH = 1000  # Au-delà, ligne suspecte ignorée
+_UTF8_CHUNK = 64 * 1024  # Caractères encodés à la fois par _utf8_len_leq
+
+# Expressions compilées une fois au chargement du module
+_FNAME_BAD_RE = re.compile(r'[<>:"/\|?*]')          # sanitize_filename (sans antislash)
+_FNAME_BAD_SECURE_RE = re.compile(r'[<>:"/\\|?*]')  # sanitize_filename_secure
+_CTRL_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_WS_RE = re.compile(r'\s+')
+_SUSPICIOUS_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'eval\s*\(',
+    r'exec\s*\(',
+    r'__import__\s*\(',
+    r'subprocess\.',
+    r'os\.system',
+    r'shell=True'
+))
+# Union des motifs suspects: un seul balayage du diff dans le cas courant (aucun motif)
+_SUSPICIOUS_ANY_RE = re.compile('|'.join(f'(?:{p.pattern})' for p in _SUSPICIOUS_RES), re.IGNORECASE)
+
+
 class ValidationError(Exception):
     """Erreur de validation d'entrée"""
     pass
 
+def _is_diff_line(line: str) -> bool:
+    """Ligne de diff: en-tête, contexte, ou +x / -x (ni '++', ni '--', ni '+'/'-' seul)"""
+    if line.startswith(_VALID_PREFIXES):
+        return True
+    marker = line[:1]
+    if marker == '+' or marker == '-':
+        second = line[1:2]
+        return second != '' and second != marker
+    return False
+
+def _has_diff_line(text: str) -> bool:
+    """Cherche une ligne de diff parmi les premières lignes (découpage sur '\\n' sans liste)"""
+    start = 0
+    for _ in range(_MAX_DIFF_LINES):
+        end = text.find('\n', start)
+        stop = len(text) if end == -1 else end
+        if stop - start <= _MAX_DIFF_LINE_LENGTH and _is_diff_line(text[start:stop]):
+            return True
+        if end == -1:
+            return False
+        start = end + 1
+    return False
+
+def _utf8_len_leq(text: str, limit: int) -> bool:
+    """Indique si text tient en limit octets UTF-8, sans encoder tout le texte"""
+    # 1 à 4 octets par caractère: len(text) borne la taille dans les deux sens
+    length = len(text)
+    if length > limit:
+        return False
+    if length * 4 <= limit or text.isascii():
+        return True
+
+    # Encodage par morceaux, arrêté dès que la limite est dépassée
+    total = 0
+    for start in range(0, length, _UTF8_CHUNK):
+        total += len(text[start:start + _UTF8_CHUNK].encode('utf-8'))
+        if total > limit:
+            return False
+    return True
+
+
+def _resolved_cwd() -> Path:
+    """Répertoire de travail résolu à chaque appel (chdir, liens symboliques redirigés)"""
+    return Path(os.getcwd()).resolve()
+
+def _is_within(path: Path, root: Path) -> bool:
+    """Indique si path (résolu) est root ou se trouve sous root, par préfixe de chaîne"""
+    # normcase: comparaison insensible à la casse sous Windows, comme relative_to
+    path_str = os.path.normcase(str(path))
+    root_str = os.path.normcase(str(root))
+    if path_str == root_str:
+        return True
+    # La racine du système se termine déjà par le séparateur
+    if not root_str.endswith(os.sep):
+        root_str += os.sep
+    return path_str.startswith(root_str)
+
+def _default_allowed_dirs() -> tuple:
+    """Répertoires autorisés par défaut, résolus à chaque appel
+
+    Pas de mise en cache: un contrôle de sécurité ne doit pas s'appuyer sur
+    une résolution périmée.
+    """
+    cwd = Path(os.getcwd())
+    return tuple(path.resolve() for path in (
+        cwd,
+        Path.home() / '.config' / 'smart-patch',
+        Path('/tmp') if os.name == 'posix' else cwd / 'temp'
+    ))
+
 
 def validate_patch_content(original_content: str, diff_content: str) -> None:
     """Valide le contenu des patches"""
@@ -24,8 +133,9 @@ def validate_patch_content(original_content: str, diff_content: str) -> None:
     if len(diff_content.strip()) == 0:
         raise ValidationError("diff_content cannot be empty")
 
-    # Vérifier que c'est un diff valide
-    if not any(line.startswith(('@@', '---', '+++', '+', '-')) for line in diff_content.split('\n')):
+    # Vérifier que c'est un diff valide (une ligne commençant par @@, + ou -)
+    if not (diff_content.startswith(('@@', '+', '-')) or '\n+' in diff_content
+            or '\n-' in diff_content or '\n@@' in diff_content):
         raise ValidationError("diff_content does not appear to be a valid diff")
 
 
@@ -38,12 +148,8 @@ def validate_file_path(file_path: Union[str, Path], must_exist: bool = True) ->
         raise ValidationError(f"file_path must be string or Path, got {type(file_path)}")
 
     # Vérifier contre path traversal
-    try:
-        resolved = file_path.resolve()
-        # Vérifier que le chemin résolu ne sort pas du répertoire de travail
-        cwd = Path.cwd().resolve()
-        resolved.relative_to(cwd)
-    except ValueError:
+    # Vérifier que le chemin résolu ne sort pas du répertoire de travail
+    if not _is_within(file_path.resolve(), _resolved_cwd()):
         raise ValidationError(f"Unsafe path detected: {file_path}")
 
     if must_exist and not file_path.exists():
@@ -52,7 +158,7 @@ def validate_file_path(file_path: Union[str, Path], must_exist: bool = True) ->
     return file_path
 
 
-def validate_config_section(config_dict: dict, section: str, required_keys: list = None) -> None:
+def validate_config_section(config_dict: dict, section: str, required_keys: Optional[list] = None) -> None:
     """Valide une section de configuration"""
     if not isinstance(config_dict, dict):
         raise ValidationError(f"Config must be dict, got {type(config_dict)}")
@@ -76,12 +182,10 @@ def sanitize_filename(filename: str) -> str:
         raise ValidationError(f"filename must be string, got {type(filename)}")
 
     # Supprimer les caractères dangereux
-    import re
-    cleaned = re.sub(r'[<>:"/\|?*]', '_', filename)
+    cleaned = _FNAME_BAD_RE.sub('_', filename)
 
     # Supprimer les noms réservés Windows
-    reserved = ['CON', 'PRN', 'AUX', 'NUL'] + [f'COM{i}' for i in range(1, 10)] + [f'LPT{i}' for i in range(1, 10)]
-    if cleaned.upper() in reserved:
+    if cleaned.upper() in _RESERVED_WINDOWS:
         cleaned = f"_{cleaned}"
 
     # Limiter la longueur
@@ -91,14 +195,12 @@ def sanitize_filename(filename: str) -> str:
     return cleaned
 
 def validate_file_path_secure(file_path: Union[str, Path], must_exist: bool = True,
-                             allowed_dirs: List[Path] = None) -> Path:
+                             allowed_dirs: Optional[List[Path]] = None) -> Path:
     """Validation sécurisée contre path traversal et autres attaques"""
-    import os
-
     if isinstance(file_path, str):
         file_path = Path(file_path)
 
-    if not isinstance(file_path, Path):
+    if __debug__ and not hasattr(file_path, 'resolve'):
         raise ValidationError(f"file_path must be string or Path, got {type(file_path)}")
 
     # Nettoyer le chemin de caractères dangereux
@@ -112,25 +214,14 @@ def validate_file_path_secure(file_path: Union[str, Path], must_exist: bool = Tr
     try:
         resolved = file_path.resolve()
 
-        # Définir les répertoires autorisés
+        # Définir les répertoires autorisés (déjà résolus par défaut)
         if allowed_dirs is None:
-            allowed_dirs = [
-                Path.cwd(),
-                Path.home() / '.config' / 'smart-patch',
-                Path('/tmp') if os.name == 'posix' else Path.cwd() / 'temp'
-            ]
+            allowed_roots = _default_allowed_dirs()
+        else:
+            allowed_roots = tuple(allowed_dir.resolve() for allowed_dir in allowed_dirs)
 
         # Vérifier que le chemin est dans un répertoire autorisé
-        is_allowed = False
-        for allowed_dir in allowed_dirs:
-            try:
-                resolved.relative_to(allowed_dir.resolve())
-                is_allowed = True
-                break
-            except ValueError:
-                continue
-
-        if not is_allowed:
+        if not any(_is_within(resolved, allowed_root) for allowed_root in allowed_roots):
             raise ValidationError(f"Path outside allowed directories: {resolved}")
 
         # Vérifications supplémentaires
@@ -138,7 +229,7 @@ def validate_file_path_secure(file_path: Union[str, Path], must_exist: bool = Tr
             # Vérifier que le lien symbolique pointe vers un endroit sûr
             target = resolved.readlink()
             if target.is_absolute():
-                validate_file_path_secure(target, must_exist=False, allowed_dirs=allowed_dirs)
+                validate_file_path_secure(target, must_exist=False, allowed_dirs=list(allowed_roots))
 
     except (OSError, ValueError) as e:
         raise ValidationError(f"Path validation failed: {e}")
@@ -151,76 +242,42 @@ def validate_file_path_secure(file_path: Union[str, Path], must_exist: bool = Tr
 def validate_patch_content_secure(original_content: str, diff_content: str,
                                  max_size_mb: int = 50) -> None:
     """Validation sécurisée du contenu avec protection DoS"""
-    import re
-
-    # Validation de type
-    if not isinstance(original_content, str):
+    # Validation de type (désactivée sous python -O)
+    if __debug__ and not isinstance(original_content, str):
         raise ValidationError(f"original_content must be string, got {type(original_content)}")
 
-    if not isinstance(diff_content, str):
+    if __debug__ and not isinstance(diff_content, str):
         raise ValidationError(f"diff_content must be string, got {type(diff_content)}")
 
     # Protection contre DoS par taille
     max_size_bytes = max_size_mb * 1024 * 1024
-    if len(original_content.encode('utf-8')) > max_size_bytes:
+    if not _utf8_len_leq(original_content, max_size_bytes):
         raise ValidationError(f"Original content too large (>{max_size_mb}MB)")
 
-    if len(diff_content.encode('utf-8')) > max_size_bytes:
+    if not _utf8_len_leq(diff_content, max_size_bytes):
         raise ValidationError(f"Diff content too large (>{max_size_mb}MB)")
 
     # Validation de contenu
     if len(diff_content.strip()) == 0:
         raise ValidationError("diff_content cannot be empty")
 
-    # Vérifier que c'est un diff valide avec protection ReDoS
-    valid_patterns = [
-        r'^@@',
-        r'^---',
-        r'^\+\+\+',
-        r'^\+[^+]',
-        r'^-[^-]',
-        r'^ '
-    ]
-
-    lines = diff_content.split('\n')[:1000]  # Limiter pour éviter DoS
-    has_valid_content = False
-
-    for line in lines:
-        if len(line) > 1000:  # Ligne suspecte
-            continue
-        for pattern in valid_patterns:
-            if re.match(pattern, line):
-                has_valid_content = True
-                break
-        if has_valid_content:
-            break
-
-    if not has_valid_content:
+    # Vérifier que c'est un diff valide avec protection ReDoS; le cas courant (première
+    # ligne déjà un en-tête ou un hunk) est tranché sans découper le contenu
+    if not _has_diff_line(diff_content):
         raise ValidationError("diff_content does not appear to be a valid diff")
 
-    # Détection de patterns suspects
-    suspicious_patterns = [
-        r'eval\s*\(',
-        r'exec\s*\(',
-        r'__import__\s*\(',
-        r'subprocess\.',
-        r'os\.system',
-        r'shell=True'
-    ]
-
-    for pattern in suspicious_patterns:
-        if re.search(pattern, diff_content, re.IGNORECASE):
-            raise ValidationError(f"Suspicious pattern detected: {pattern}")
+    # Détection de patterns suspects (motif signalé: le premier de la liste qui correspond)
+    if _SUSPICIOUS_ANY_RE.search(diff_content):
+        for pattern in _SUSPICIOUS_RES:
+            if pattern.search(diff_content):
+                raise ValidationError(f"Suspicious pattern detected: {pattern.pattern}")
 
 def sanitize_filename_secure(filename: str, max_length: int = 100) -> str:
     """Nettoyage sécurisé de nom de fichier"""
-    import re
-    import unicodedata
-    
     # CORRECTION: Sauvegarder le nom original
     original_filename = filename
 
-    if not isinstance(filename, str):
+    if __debug__ and not isinstance(filename, str):
         raise ValidationError(f"filename must be string, got {type(filename)}")
 
     if len(filename) > max_length * 2:  # Protection contre les noms très longs
@@ -230,25 +287,17 @@ def sanitize_filename_secure(filename: str, max_length: int = 100) -> str:
     filename = unicodedata.normalize('NFKC', filename)
 
     # Supprimer caractères de contrôle et dangereux
-    filename = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', filename)
+    filename = _CTRL_RE.sub('', filename)
 
     # Supprimer caractères dangereux pour les systèmes de fichiers
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _FNAME_BAD_SECURE_RE.sub('_', filename)
 
     # Supprimer espaces multiples et début/fin
-    filename = re.sub(r'\s+', ' ', filename).strip()
-
-    # Vérifier contre noms réservés (étendus)
-    reserved_names = {
-        'windows': ['CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'COM4',
-                   'COM5', 'COM6', 'COM7', 'COM8', 'COM9', 'LPT1', 'LPT2',
-                   'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9'],
-        'unix': ['.', '..', '']
-    }
+    filename = _WS_RE.sub(' ', filename).strip()
 
     # Vérifier contre tous les noms réservés
     base_name = filename.split('.')[0].upper()
-    if base_name in reserved_names['windows'] or filename in reserved_names['unix']:
+    if base_name in _RESERVED_WINDOWS or filename in _RESERVED_UNIX:
         filename = f"safe_{filename}"
 
     # Limiter la longueur finale
@@ -262,3 +311,44 @@ def sanitize_filename_secure(filename: str, max_length: int = 100) -> str:
         filename = f"safe_file_{hash(original_filename) % 1000}"
 
     return filename
+
+
+# --- Module natif (mypyc) ---
+# Le correcteur compile ce fichier tronqué à la ligne ci-dessus en _validation_c
+
+_NATIVE_FUNCTIONS = ('validate_patch_content', 'validate_file_path', 'validate_config_section',
+                     'sanitize_filename', 'validate_file_path_secure',
+                     'validate_patch_content_secure', 'sanitize_filename_secure')
+
+def _load_native():
+    """Module natif à jour, ou None (absent ou construit depuis une autre version)"""
+    try:
+        import _validation_c as native
+    except ImportError:
+        return None
+
+    try:
+        with open(__file__, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+    return native if getattr(native, '_SOURCE_SHA256', None) == digest else None
+
+def _native_wrapper(native_func, python_func, native_error):
+    """Appelle la version native en conservant le contrat d'erreurs de ce module"""
+    @functools.wraps(python_func)
+    def wrapper(*args, **kwargs):
+        try:
+            return native_func(*args, **kwargs)
+        except native_error as e:
+            raise ValidationError(*e.args) from None
+        except TypeError:
+            # Types refusés par mypyc: la version Python lève ValidationError
+            return python_func(*args, **kwargs)
+    return wrapper
+
+_native = _load_native()
+if _native is not None:
+    for _name in _NATIVE_FUNCTIONS:
+        globals()[_name] = _native_wrapper(getattr(_native, _name), globals()[_name],
+                                           _native.ValidationError)
@@ -1,6 +1,7 @@
 from typing import Any, Dict, List, Optional, Protocol, Tuple, Union
 """Module wizard_mode.py - Classe WizardMode."""
 
+import os
 import sys
 import glob
 import logging
@@ -272,21 +273,21 @@ class WizardMode:
         print(f"\n{Colors.CYAN}🔍 Recherche automatique...{Colors.END}")
 
         current_dir = Path.cwd()
-        patches_found = list(current_dir.glob('*.patch')) + list(current_dir.glob('*.diff'))
 
-        # Recherche plus large
-        for pattern in ['**/*.patch', '**/*.diff']:
-            patches_found.extend(list(current_dir.glob(pattern)))
-
-        # Supprimer les doublons et limiter la profondeur
+        # Parcours unique, limité à 3 niveaux de profondeur
         unique_patches = []
         seen = set()
-        for patch in patches_found:
-            if patch.resolve() not in seen:
-                seen.add(patch.resolve())
-                # Limiter à 3 niveaux de profondeur max
-                if len(patch.relative_to(current_dir).parts) <= 3:
-                    unique_patches.append(patch)
+        for root, dirs, files in os.walk(current_dir):
+            depth = len(Path(root).relative_to(current_dir).parts)
+            if depth >= 2:
+                dirs.clear()
+            for name in sorted(files):
+                if os.path.splitext(name)[1] in ('.patch', '.diff'):
+                    patch = Path(root) / name
+                    resolved = patch.resolve()
+                    if resolved not in seen:
+                        seen.add(resolved)
+                        unique_patches.append(patch)
 
         patches_found = unique_patches[:20]  # Limiter à 20 patches max pour l'affichage
 
@@ -389,7 +390,7 @@ class WizardMode:
 
                 # Détection de complexité
                 chunk_count = content.count('@@')
-                lines_count = len(content.split('\n'))
+                lines_count = content.count('\n') + 1
 
                 if chunk_count > 10 or lines_count > 200:
                     complex_patches.append(patch.name)
@@ -915,7 +916,7 @@ class WizardMode:
 
             dir_path = Path(dir_str)
 
-            if dir_path.exists() and dir_path.is_dir():
+            if dir_path.is_dir():
                 return dir_path
             else:
                 print(f"❌ Répertoire non trouvé: {dir_path}")
@@ -934,7 +935,7 @@ class WizardMode:
 
             file_path = Path(file_str)
 
-            if file_path.exists() and file_path.is_file():
+            if file_path.is_file():
                 return file_path
             else:
                 print(f"❌ Fichier non trouvé: {file_path}")